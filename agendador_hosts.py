@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Agendador adaptativo de requisições por host
+Ajusta o intervalo entre requisições a cada portal conforme a latência e
+os erros observados (AIMD) e repete falhas transitórias com backoff
+"""
+
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+
+INTERVALO_INICIAL = 2.0  # segundos entre requisições a um host desconhecido
+INTERVALO_MINIMO = 0.25
+INTERVALO_MAXIMO = 60.0
+PASSO_ADITIVO = 0.25  # redução do intervalo a cada resposta rápida
+FATOR_MULTIPLICATIVO = 2.0  # aumento do intervalo a cada falha
+LATENCIA_SAUDAVEL = 1.5  # segundos; respostas mais lentas não reduzem o intervalo
+SUAVIZACAO = 0.3  # peso da última amostra nas médias móveis
+
+MAX_TENTATIVAS = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAXIMO = 30.0  # também a maior pausa (Retry-After) esperada dentro de uma coleta
+
+STATUS_TRANSITORIOS = frozenset((429, 500, 502, 503, 504))
+
+class HostSuspenso(requests.RequestException):
+    """O host pediu, via Retry-After, uma pausa maior do que ``BACKOFF_MAXIMO``"""
+
+def erro_transitorio(erro):
+    """Indica se vale a pena repetir a requisição que falhou com ``erro``"""
+    if isinstance(erro, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if isinstance(erro, requests.HTTPError) and erro.response is not None:
+        return erro.response.status_code in STATUS_TRANSITORIOS
+    return False
+
+def ler_retry_after(erro):
+    """Segundos pedidos pelo cabeçalho Retry-After da resposta, se houver"""
+    response = getattr(erro, 'response', None)
+    valor = response.headers.get('Retry-After') if response is not None else None
+    if not valor:
+        return None
+    try:
+        return max(0.0, float(valor))
+    except ValueError:
+        pass
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is None:
+        data = data.replace(tzinfo=timezone.utc)
+    return max(0.0, (data - datetime.now(timezone.utc)).total_seconds())
+
+class EstadoHost:
+    """Intervalo atual e estatísticas recentes de um host"""
+
+    def __init__(self, intervalo):
+        self.intervalo = intervalo
+        self.liberado_em = 0.0  # time.monotonic() a partir do qual pode haver nova requisição
+        self.suspenso_ate = 0.0  # até quando o host pediu uma pausa longa (Retry-After)
+        self.latencia = None
+        self.taxa_erro = 0.0
+        self.trava = threading.Lock()
+
+class AgendadorHosts:
+    """Espaça e repete requisições por host de forma adaptativa
+
+    Cada host funciona como um balde de uma ficha reposta a cada
+    ``intervalo`` segundos. Respostas rápidas reduzem o intervalo em um passo
+    fixo; erros e respostas 429/5xx o multiplicam. Falhas transitórias são
+    repetidas com backoff exponencial com jitter, respeitando Retry-After.
+    Um Retry-After maior do que ``BACKOFF_MAXIMO`` não é esperado: o host
+    fica suspenso por esse tempo e as requisições a ele falham na hora com
+    ``HostSuspenso``, até a pausa passar (em uma coleta seguinte).
+    """
+
+    def __init__(self, intervalo_inicial=INTERVALO_INICIAL, max_tentativas=MAX_TENTATIVAS):
+        self.intervalo_inicial = intervalo_inicial
+        self.max_tentativas = max_tentativas
+        self._hosts = {}
+        self._trava = threading.Lock()
+
+    def estado(self, url):
+        host = urlparse(url).netloc
+        with self._trava:
+            if host not in self._hosts:
+                self._hosts[host] = EstadoHost(self.intervalo_inicial)
+            return self._hosts[host]
+
+    def verificar_suspensao(self, url):
+        """Levanta ``HostSuspenso`` se o host ainda estiver na pausa que pediu"""
+        estado = self.estado(url)
+        restante = estado.suspenso_ate - time.monotonic()
+        if restante > 0:
+            raise HostSuspenso(f"{urlparse(url).netloc} pediu pausa de mais {restante:.0f}s (Retry-After)")
+
+    def aguardar(self, url):
+        """Bloqueia até o host da URL poder receber outra requisição; retorna a espera"""
+        estado = self.estado(url)
+        with estado.trava:
+            espera = estado.liberado_em - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            estado.liberado_em = time.monotonic() + estado.intervalo
+        return max(0.0, espera)
+
+    def registrar_sucesso(self, url, latencia):
+        estado = self.estado(url)
+        with estado.trava:
+            estado.latencia = latencia if estado.latencia is None else (
+                SUAVIZACAO * latencia + (1 - SUAVIZACAO) * estado.latencia
+            )
+            estado.taxa_erro *= (1 - SUAVIZACAO)
+            if estado.latencia <= LATENCIA_SAUDAVEL:
+                estado.intervalo = max(INTERVALO_MINIMO, estado.intervalo - PASSO_ADITIVO)
+
+    def registrar_falha(self, url, retry_after=None):
+        estado = self.estado(url)
+        with estado.trava:
+            estado.taxa_erro = SUAVIZACAO + (1 - SUAVIZACAO) * estado.taxa_erro
+            estado.intervalo = min(INTERVALO_MAXIMO, estado.intervalo * FATOR_MULTIPLICATIVO)
+            if retry_after is None:
+                return
+            if retry_after > BACKOFF_MAXIMO:
+                estado.suspenso_ate = max(estado.suspenso_ate, time.monotonic() + retry_after)
+            else:
+                estado.liberado_em = max(estado.liberado_em, time.monotonic() + retry_after)
+
+    def executar(self, url, requisitar, metrica=None):
+        """Executa ``requisitar()`` respeitando o intervalo do host e repetindo falhas transitórias
+
+        Se ``metrica`` for informada, acumula o tempo de espera em
+        ``esperaMs`` e o número de tentativas em ``tentativas``.
+        """
+        for tentativa in range(1, self.max_tentativas + 1):
+            self.verificar_suspensao(url)
+            espera = self.aguardar(url)
+            if metrica is not None:
+                metrica['esperaMs'] = round((metrica.get('esperaMs') or 0) + espera * 1000, 2)
+                metrica['tentativas'] = tentativa
+
+            inicio = time.monotonic()
+            try:
+                resultado = requisitar()
+            except Exception as erro:
+                if not erro_transitorio(erro):
+                    raise
+                retry_after = ler_retry_after(erro)
+                self.registrar_falha(url, retry_after)
+                if tentativa == self.max_tentativas:
+                    raise
+                if retry_after is not None and retry_after > BACKOFF_MAXIMO:
+                    # Esperar prenderia a coleta (e a trava dela); fica para a próxima
+                    print(f"   ⏸️  {urlparse(url).netloc}: Retry-After de {retry_after:.0f}s, host suspenso nesta coleta")
+                    raise
+
+                # Full jitter, mas nunca antes do que o servidor pediu
+                atraso = random.uniform(0, min(BACKOFF_MAXIMO, BACKOFF_BASE * 2 ** (tentativa - 1)))
+                if retry_after is not None:
+                    atraso = max(atraso, retry_after)
+                print(f"   🔁 {urlparse(url).netloc}: {type(erro).__name__}, nova tentativa em {atraso:.1f}s")
+                time.sleep(atraso)
+                continue
+
+            self.registrar_sucesso(url, time.monotonic() - inicio)
+            return resultado
@@ -5,21 +5,150 @@ Analisador Automático de Sites de Notícias
 Descobre automaticamente seletores para busca e extração de notícias
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
 import time
 
+from agendador_hosts import AgendadorHosts
+from cliente_http import obter_sessao
+from descoberta_seletores import (IndiceDOM, descobrir_registros, escolher_container, escolher_seletor,
+                                  escolher_seletor_registros, padroes_registros)
+from parser_html import criar_documento
+
+# Análise concorrente: sites analisados ao mesmo tempo e requisições
+# simultâneas a um mesmo host (o intervalo entre elas vem do AgendadorHosts)
+MAX_ANALISES_SIMULTANEAS = 8
+MAX_REQUISICOES_POR_HOST = 4  # permite disputar as quatro URLs padrão de busca ao mesmo tempo
+
+# Sondagem das URLs padrão de busca: só o começo da página é baixado
+TAMANHO_SONDAGEM = 64 * 1024
+TERMO_SONDAGEM = 'test'
+MARCADORES_RESULTADOS = (
+    'search-results', 'search-no-results', 'resultados da busca', 'resultados de busca',
+    'resultados para', 'voce pesquisou', 'você pesquisou',
+)
+
+# Cada configuração é gravada aqui assim que sua análise termina
+ARQUIVO_CONFIGURACOES_NDJSON = 'configuracoes_descobertas.ndjson'
+
+# Páginas baixadas durante a análise ficam em memória por este tempo (segundos)
+TTL_CACHE_ANALISE = 10 * 60
+MAX_PAGINAS_CACHE = 64
+
+# Termo usado no teste da busca e na URL de busca da configuração gerada,
+# para que a validação encontre a página de resultados já baixada
+TERMO_BUSCA = "Paranavaí"
+
+# Como encontrar o container das notícias: 'padroes' (classes conhecidas,
+# como article e .post), 'estrutural' (registros repetidos na página) ou
+# 'auto' (padrões e, se nenhum servir, a estrutura)
+MODOS_DESCOBERTA = ('auto', 'padroes', 'estrutural')
+MODO_DESCOBERTA = 'auto'
+
+class CacheAnalise:
+    """Páginas baixadas durante a análise, com o documento parseado
+
+    Chave pela URL, com validade de ``ttl`` segundos e no máximo
+    ``max_paginas`` páginas (as menos usadas saem primeiro). Só respostas
+    2xx de GET são guardadas.
+    """
+
+    def __init__(self, ttl=TTL_CACHE_ANALISE, max_paginas=MAX_PAGINAS_CACHE):
+        self.ttl = ttl
+        self.max_paginas = max_paginas
+        self._paginas = OrderedDict()
+        self._trava = threading.Lock()
+
+    def obter(self, url):
+        with self._trava:
+            pagina = self._paginas.get(url)
+            if pagina is None:
+                return None
+            if time.monotonic() - pagina['baixadaEm'] > self.ttl:
+                del self._paginas[url]
+                return None
+            self._paginas.move_to_end(url)
+            return pagina
+
+    def guardar(self, url, response):
+        pagina = {'response': response, 'documento': None, 'baixadaEm': time.monotonic()}
+        if 200 <= response.status_code < 300:
+            with self._trava:
+                self._paginas[url] = pagina
+                self._paginas.move_to_end(url)
+                while len(self._paginas) > self.max_paginas:
+                    self._paginas.popitem(last=False)
+        return pagina
+
 class AnalisadorSites:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.8,en;q=0.5,en-US;q=0.3',
-        })
+    def __init__(self, sessao=None, agendador=None, cache=None, modo_descoberta=MODO_DESCOBERTA):
+        # Por padrão usa a sessão HTTP compartilhada com o scraper
+        self.session = sessao if sessao is not None else obter_sessao()
+        self.agendador = agendador if agendador is not None else AgendadorHosts()
+        self.cache = cache if cache is not None else CacheAnalise()
+        self.modo_descoberta = modo_descoberta
+        self._limites_host = {}
+        self._trava = threading.Lock()
+    
+    def limite_host(self, url):
+        """Semáforo que limita as requisições simultâneas ao host da URL"""
+        host = urlparse(url).netloc
+        with self._trava:
+            if host not in self._limites_host:
+                self._limites_host[host] = threading.BoundedSemaphore(MAX_REQUISICOES_POR_HOST)
+            return self._limites_host[host]
+    
+    def requisitar(self, metodo, url, espacar=True, **opcoes):
+        """Faz uma requisição respeitando o limite e, com ``espacar``, o intervalo do host"""
+        with self.limite_host(url):
+            if not espacar:
+                return self.session.request(metodo, url, **opcoes)
+            return self.agendador.executar(url, lambda: self.session.request(metodo, url, **opcoes))
+    
+    def baixar(self, url, timeout=15):
+        """Página da URL (``response`` e ``documento``), do cache da análise ou da rede"""
+        pagina = self.cache.obter(url)
+        if pagina is None:
+            pagina = self.cache.guardar(url, self.requisitar('GET', url, timeout=timeout))
+        return pagina
+    
+    def documento(self, pagina):
+        """Documento parseado da página, criado uma única vez"""
+        if pagina['documento'] is None:
+            pagina['documento'] = criar_documento(pagina['response'].content)
+        return pagina['documento']
+    
+    def sondar_busca(self, url, cancelado=None):
+        """Indica se ``url`` responde com uma página de resultados de busca
+
+        Pede só os primeiros ``TAMANHO_SONDAGEM`` bytes (Range) e para de ler
+        ao atingi-los, ou assim que ``cancelado`` for sinalizado.
+        """
+        if cancelado is not None and cancelado.is_set():
+            return False
+        
+        response = self.requisitar('GET', url, espacar=False, timeout=10, stream=True,
+                                   headers={'Range': f'bytes=0-{TAMANHO_SONDAGEM - 1}'})
+        try:
+            if response.status_code not in (200, 206):
+                return False
+            if 'html' not in response.headers.get('Content-Type', 'text/html'):
+                return False
+            
+            inicio = b''
+            for bloco in response.iter_content(16 * 1024):
+                inicio += bloco
+                if len(inicio) >= TAMANHO_SONDAGEM or (cancelado is not None and cancelado.is_set()):
+                    break
+        finally:
+            response.close()
+        
+        texto = inicio[:TAMANHO_SONDAGEM].decode('utf-8', 'ignore').lower()
+        return bool(re.search(rf'\b{TERMO_SONDAGEM}\b', texto)) or any(m in texto for m in MARCADORES_RESULTADOS)
     
     def analisar_site(self, url_site):
         """Analisa um site completo e descobre seus seletores"""
@@ -28,10 +157,10 @@ class AnalisadorSites:
         try:
             # 1. Acessar página principal
             print("📡 Acessando página principal...")
-            response = self.session.get(url_site, timeout=15)
-            response.raise_for_status()
+            pagina = self.baixar(url_site, timeout=15)
+            pagina['response'].raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.documento(pagina)
             
             # 2. Descobrir formulário de busca
             print("🔎 Procurando formulário de busca...")
@@ -44,8 +173,8 @@ class AnalisadorSites:
             print(f"✅ Busca encontrada: {busca_info['url']}")
             
             # 3. Testar busca por "Paranavaí"
-            print("🧪 Testando busca por 'Paranavaí'...")
-            resultados_busca = self.testar_busca(busca_info, "Paranavaí")
+            print(f"🧪 Testando busca por '{TERMO_BUSCA}'...")
+            resultados_busca = self.testar_busca(busca_info, TERMO_BUSCA)
             
             if not resultados_busca:
                 print("❌ Busca não retornou resultados")
@@ -144,11 +273,22 @@ class AnalisadorSites:
             f"{base_url}/?search="
         ]
         
-        for url_teste in urls_padrao:
-            try:
-                test_url = url_teste + "test"
-                test_response = self.session.get(test_url, timeout=10)
-                if test_response.status_code == 200:
+        # Todas as URLs são sondadas ao mesmo tempo; a primeira que responder
+        # com uma página de resultados vence e as demais são canceladas
+        cancelado = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=len(urls_padrao))
+        futuros = {
+            executor.submit(self.sondar_busca, url_teste + TERMO_SONDAGEM, cancelado): url_teste
+            for url_teste in urls_padrao
+        }
+        try:
+            for futuro in as_completed(futuros):
+                try:
+                    funciona = futuro.result()
+                except Exception:
+                    continue
+                if funciona:
+                    url_teste = futuros[futuro]
                     print(f"   ✅ URL padrão funciona: {url_teste}")
                     return {
                         'url': url_teste,
@@ -156,31 +296,38 @@ class AnalisadorSites:
                         'method': 'GET',
                         'tipo': 'url_padrao'
                     }
-            except:
-                continue
+        finally:
+            cancelado.set()
+            executor.shutdown(wait=False, cancel_futures=True)
         
         return None
     
-    def testar_busca(self, busca_info, termo="Paranavaí"):
+    def montar_url_busca(self, busca_info, termo=TERMO_BUSCA):
+        """URL de uma busca GET pelo termo"""
+        if '?' not in busca_info['url']:
+            return f"{busca_info['url']}?{busca_info['campo']}={termo}"
+        return f"{busca_info['url']}{termo}"
+    
+    def testar_busca(self, busca_info, termo=TERMO_BUSCA):
         """Testa a busca com um termo específico"""
         try:
             if busca_info['method'] == 'GET':
-                # Busca via GET
-                url_busca = f"{busca_info['url']}{termo}"
-                if '?' not in busca_info['url']:
-                    url_busca = f"{busca_info['url']}?{busca_info['campo']}={termo}"
+                # Busca via GET (a página fica no cache para a validação)
+                url_busca = self.montar_url_busca(busca_info, termo)
                 
                 print(f"   🌐 Testando: {url_busca}")
-                response = self.session.get(url_busca, timeout=15)
+                pagina = self.baixar(url_busca, timeout=15)
                 
             else:
                 # Busca via POST
                 data = {busca_info['campo']: termo}
                 print(f"   🌐 POST para: {busca_info['url']}")
-                response = self.session.post(busca_info['url'], data=data, timeout=15)
+                pagina = {'response': self.requisitar('POST', busca_info['url'], data=data, timeout=15),
+                          'documento': None}
             
+            response = pagina['response']
             if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
+                soup = self.documento(pagina)
                 
                 # Verificar se há resultados
                 texto_pagina = soup.get_text().lower()
@@ -220,65 +367,58 @@ class AnalisadorSites:
             '.item'
         ]
         
+        # Uma passagem pelo documento; padrões e campos são avaliados no índice
+        indice = IndiceDOM(soup)
         melhor_container = None
-        melhor_score = 0
+        if self.modo_descoberta != 'estrutural':
+            melhor_container = escolher_container(indice, container_patterns)
         
-        for pattern in container_patterns:
-            containers = soup.select(pattern)
-            if len(containers) >= 2:  # Pelo menos 2 itens
-                score = len(containers)
-                
-                # Verificar se contém elementos típicos de notícia
-                primeiro_container = containers[0]
-                
-                # Procurar títulos
-                titulos = primeiro_container.select('h1, h2, h3, h4, h5, a')
-                score += len(titulos) * 2
-                
-                # Procurar imagens
-                imagens = primeiro_container.select('img')
-                score += len(imagens)
-                
-                # Procurar links
-                links = primeiro_container.select('a[href]')
-                score += len(links)
-                
-                if score > melhor_score:
-                    melhor_score = score
-                    melhor_container = {
-                        'pattern': pattern,
-                        'elementos': containers,
-                        'score': score
-                    }
+        # Sem classes conhecidas: procurar registros repetidos pela estrutura
+        estrutural = melhor_container is None and self.modo_descoberta != 'padroes'
+        if estrutural:
+            melhor_container = descobrir_registros(indice)
         
         if not melhor_container:
             print("   ❌ Não foi possível identificar container de notícias")
             return None
         
-        print(f"   ✅ Melhor container: {melhor_container['pattern']} ({len(melhor_container['elementos'])} elementos, score: {melhor_container['score']})")
+        origem = 'registros repetidos' if estrutural else 'padrão conhecido'
+        print(f"   ✅ Melhor container: {melhor_container['pattern']} ({melhor_container['total']} elementos, score: {melhor_container['score']}, {origem})")
+        if estrutural and not melhor_container['exato']:
+            print("   ⚠️  O seletor do container também seleciona elementos que não são notícias")
         
         # Analisar estrutura interna dos containers
-        primeiro = melhor_container['elementos'][0]
+        primeiro = melhor_container['primeiro']
+        if estrutural:
+            # Registros achados pela estrutura: os campos são avaliados em todos
+            # eles, com padrões tirados também das classes dos próprios registros
+            registros = melhor_container['registros']
+            derivados = padroes_registros(indice, registros)
+            def escolher(patterns, tipo, campo):
+                return escolher_seletor_registros(indice, registros, patterns + derivados[campo], tipo)
+        else:
+            def escolher(patterns, tipo, campo):
+                return escolher_seletor(indice, primeiro, patterns, tipo)
         
         # Descobrir seletores de título
         titulo_patterns = ['h1 a', 'h2 a', 'h3 a', 'h4 a', '.title a', '.headline a', '.entry-title a', '.post-title a']
-        titulo_selector = self.encontrar_melhor_seletor(primeiro, titulo_patterns, 'título')
+        titulo_selector = escolher(titulo_patterns, 'título', 'titulo')
         
         # Descobrir seletores de resumo/descrição
         resumo_patterns = ['.excerpt', '.summary', '.description', '.lead', 'p', '.entry-summary', '.post-excerpt']
-        resumo_selector = self.encontrar_melhor_seletor(primeiro, resumo_patterns, 'resumo')
+        resumo_selector = escolher(resumo_patterns, 'resumo', 'resumo')
         
         # Descobrir seletores de link
         link_patterns = ['h1 a', 'h2 a', 'h3 a', 'h4 a', '.title a', '.headline a', '.more-link', '.read-more']
-        link_selector = self.encontrar_melhor_seletor(primeiro, link_patterns, 'link')
+        link_selector = escolher(link_patterns, 'link', 'link')
         
         # Descobrir seletores de imagem
         imagem_patterns = ['.featured-image img', '.post-thumbnail img', '.news-image img', 'img', '.thumb img']
-        imagem_selector = self.encontrar_melhor_seletor(primeiro, imagem_patterns, 'imagem')
+        imagem_selector = escolher(imagem_patterns, 'imagem', 'imagem')
         
         # Descobrir seletores de data
         data_patterns = ['.date', '.time', '.timestamp', '.published', '.post-date', 'time', '.meta-date']
-        data_selector = self.encontrar_melhor_seletor(primeiro, data_patterns, 'data')
+        data_selector = escolher(data_patterns, 'data', 'data')
         
         seletores = {
             'container': melhor_container['pattern'],
@@ -295,40 +435,14 @@ class AnalisadorSites:
         
         return seletores
     
-    def encontrar_melhor_seletor(self, container, patterns, tipo):
-        """Encontra o melhor seletor para um tipo específico"""
-        for pattern in patterns:
-            elementos = container.select(pattern)
-            if elementos:
-                elemento = elementos[0]
-                texto = elemento.get_text().strip()
-                
-                # Validações específicas por tipo
-                if tipo == 'título' and len(texto) > 10 and len(texto) < 200:
-                    return pattern
-                elif tipo == 'resumo' and len(texto) > 20:
-                    return pattern
-                elif tipo == 'link' and elemento.get('href'):
-                    return pattern
-                elif tipo == 'imagem' and elemento.get('src'):
-                    return pattern
-                elif tipo == 'data' and (re.search(r'\d{1,2}[/\-]\d{1,2}', texto) or any(mes in texto.lower() for mes in ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez'])):
-                    return pattern
-                elif tipo != 'título' and tipo != 'resumo' and elementos:
-                    return pattern
-        
-        return None
-    
     def gerar_configuracao(self, url_site, busca_info, seletores):
         """Gera configuração final para o portal"""
         parsed_url = urlparse(url_site)
         nome_site = parsed_url.netloc.replace('www.', '').split('.')[0].title()
         
-        # Criar URL de busca completa
+        # Criar URL de busca completa (a mesma testada em testar_busca)
         if busca_info['method'] == 'GET':
-            busca_url = f"{busca_info['url']}paranavaí"
-            if '?' not in busca_info['url']:
-                busca_url = f"{busca_info['url']}?{busca_info['campo']}=paranavaí"
+            busca_url = self.montar_url_busca(busca_info)
         else:
             busca_url = busca_info['url']
         
@@ -360,13 +474,14 @@ class AnalisadorSites:
         print(f"🧪 Validando configuração para {config['nome']}...")
         
         try:
-            # Testar busca
-            response = self.session.get(config['busca'], timeout=15)
+            # Testar busca (normalmente já baixada e parseada por testar_busca)
+            pagina = self.baixar(config['busca'], timeout=15)
+            response = pagina['response']
             if response.status_code != 200:
                 print(f"   ❌ Erro ao acessar URL de busca: {response.status_code}")
                 return False
             
-            soup = BeautifulSoup(response.content, 'html.parser')
+            soup = self.documento(pagina)
             
             # Testar seletores
             containers = soup.select(config['selectors']['container'])
@@ -429,36 +544,61 @@ def analisar_bem_parana():
     
     return None
 
-def analisar_multiplos_sites():
+def analisar_sites(sites, max_paralelo=MAX_ANALISES_SIMULTANEAS, analisador=None, validar=True):
+    """Analisa vários sites em paralelo, entregando cada um assim que termina
+
+    Gera tuplas (site, configuração ou None, validada ou None) na ordem em
+    que as análises terminam. A politeness por host fica a cargo do
+    analisador (limite de requisições simultâneas e AgendadorHosts).
+    """
+    analisador = analisador if analisador is not None else AnalisadorSites()
+    
+    def analisar(site):
+        config = analisador.analisar_site(site)
+        valida = analisador.validar_configuracao(config) if config and validar else None
+        return site, config, valida
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, max_paralelo))
+    try:
+        futuros = [executor.submit(analisar, site) for site in sites]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+    finally:
+        # Se quem consome parar antes do fim, as análises pendentes são canceladas
+        executor.shutdown(wait=True, cancel_futures=True)
+
+def analisar_multiplos_sites(sites_para_analisar=None, max_paralelo=MAX_ANALISES_SIMULTANEAS, analisador=None):
     """Analisa múltiplos sites automaticamente"""
     print("🌐 === ANÁLISE DE MÚLTIPLOS SITES ===\n")
     
-    sites_para_analisar = [
-        "https://www.bemparana.com.br/",
-        "https://www.paranaportal.com/",
-        "https://www.noroesteonline.com.br/",
-        # Adicione mais sites conforme necessário
-    ]
+    if sites_para_analisar is None:
+        sites_para_analisar = [
+            "https://www.bemparana.com.br/",
+            "https://www.paranaportal.com/",
+            "https://www.noroesteonline.com.br/",
+            # Adicione mais sites conforme necessário
+        ]
     
-    analisador = AnalisadorSites()
     configuracoes = []
     
-    for site in sites_para_analisar:
-        print(f"\n{'='*60}")
-        config = analisador.analisar_site(site)
-        
-        if config:
-            configuracoes.append(config)
-            
-            # Validar cada configuração
-            if analisador.validar_configuracao(config):
-                print(f"✅ {config['nome']}: SUCESSO")
+    with open(ARQUIVO_CONFIGURACOES_NDJSON, 'w', encoding='utf-8') as saida:
+        for site, config, valida in analisar_sites(sites_para_analisar, max_paralelo, analisador):
+            if config:
+                configuracoes.append(config)
+                status = 'sucesso' if valida else 'ajustes'
+                if valida:
+                    print(f"✅ {config['nome']}: SUCESSO")
+                else:
+                    print(f"⚠️  {config['nome']}: PRECISA AJUSTES")
             else:
-                print(f"⚠️  {config['nome']}: PRECISA AJUSTES")
-        else:
-            print(f"❌ {site}: FALHA NA ANÁLISE")
-        
-        time.sleep(3)  # Pausa entre análises
+                status = 'falha'
+                print(f"❌ {site}: FALHA NA ANÁLISE")
+            
+            # Uma linha por site, disponível assim que a análise termina
+            saida.write(json.dumps({"site": site, "status": status, "config": config}, ensure_ascii=False) + '\n')
+            saida.flush()
+    
+    print(f"\n📄 Resultados por site em: {ARQUIVO_CONFIGURACOES_NDJSON}")
     
     # Salvar todas as configurações
     if configuracoes:
@@ -536,16 +676,33 @@ def gerar_codigo_integracao(configuracoes):
     print("   - portais_descobertos.js (para Node.js)")
 
 if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Descobre a configuração de portais de notícias")
+    parser.add_argument('arquivo_sites', nargs='?',
+                        help='arquivo com uma URL de site por linha (analisa apenas esses sites)')
+    parser.add_argument('--paralelo', type=int, default=MAX_ANALISES_SIMULTANEAS,
+                        help='quantos sites analisar ao mesmo tempo')
+    parser.add_argument('--descoberta', choices=MODOS_DESCOBERTA, default=MODO_DESCOBERTA,
+                        help='como encontrar o container das notícias (padrão: %(default)s)')
+    args = parser.parse_args()
+    
     print("🚀 ANALISADOR AUTOMÁTICO DE SITES DE NOTÍCIAS")
     print("=" * 60)
     
-    # Opção 1: Analisar apenas o Bem Paraná (conforme sugerido)
-    print("\n1️⃣  Analisando Bem Paraná (sugestão do usuário)...")
-    bem_parana_config = analisar_bem_parana()
-    
-    # Opção 2: Análise de múltiplos sites
-    print("\n2️⃣  Analisando múltiplos sites...")
-    todas_configs = analisar_multiplos_sites()
+    if args.arquivo_sites:
+        with open(args.arquivo_sites, 'r', encoding='utf-8') as f:
+            sites = [linha.strip() for linha in f if linha.strip() and not linha.startswith('#')]
+        print(f"\n🌐 Analisando {len(sites)} sites ({args.paralelo} em paralelo)...")
+        todas_configs = analisar_multiplos_sites(sites, args.paralelo, AnalisadorSites(modo_descoberta=args.descoberta))
+    else:
+        # Opção 1: Analisar apenas o Bem Paraná (conforme sugerido)
+        print("\n1️⃣  Analisando Bem Paraná (sugestão do usuário)...")
+        bem_parana_config = analisar_bem_parana()
+        
+        # Opção 2: Análise de múltiplos sites
+        print("\n2️⃣  Analisando múltiplos sites...")
+        todas_configs = analisar_multiplos_sites(max_paralelo=args.paralelo,
+                                                 analisador=AnalisadorSites(modo_descoberta=args.descoberta))
     
     # Gerar código de integração
     if todas_configs:
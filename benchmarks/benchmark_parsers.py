@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark dos backends de parsing HTML
+Roda as páginas salvas de portais em cada backend instalado, mede o tempo
+e confere se as notícias extraídas são idênticas às do html.parser e se a
+descoberta estrutural acha os registros esperados
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import scraper_avancado  # noqa: E402
+from descoberta_seletores import IndiceDOM, descobrir_registros  # noqa: E402
+from parser_html import backends_disponiveis, criar_documento  # noqa: E402
+
+# Páginas salvas e o portal que as gerou. A do Paraná Portal tem
+# <article class="post">, que casa com as duas partes de "article, .post"
+FIXTURES = {
+    'benchmarks/fixtures/parana-portal.html': 'Paraná Portal',
+    'benchmarks/fixtures/portal-da-cidade-paranavai.html': 'Portal da Cidade Paranavaí',
+    'benchmarks/fixtures/folha-de-paranavai-online.html': 'Folha de Paranavaí Online',
+    'benchmarks/fixtures/noroeste-online.html': 'Noroeste Online',
+    'benchmarks/fixtures/portal-tri-noticias.html': 'Portal Tri Notícias',
+    'benchmarks/fixtures/bing-news-parana.html': 'Bing News Paraná',
+    'backend/bem_parana_busca_debug.html': 'Bem Paraná',
+    'bem_parana_busca.html': 'Bem Paraná',
+    'debug_bing_news.html': 'Bing News Paraná',
+}
+
+# Páginas em que a descoberta estrutural deve achar um seletor que selecione
+# exatamente os elementos do seletor de referência. Os posts do Paraná
+# Portal têm formatos diferentes (padrão, galeria, vídeo sem imagem)
+REGISTROS_ESPERADOS = {
+    'benchmarks/fixtures/parana-portal.html': 'article',
+}
+
+# Campos que mudam a cada execução e não entram na comparação
+CAMPOS_VOLATEIS = ('coletadoEm',)
+
+def obter_portal(nome):
+    for portal in scraper_avancado.PORTAIS_PARCEIROS:
+        if portal['nome'] == nome:
+            return portal
+    raise SystemExit(f"Portal não encontrado em PORTAIS_PARCEIROS: {nome}")
+
+def extrair(portal, conteudo, backend):
+    if portal.get('tipo') == 'bing_news':
+        return scraper_avancado.parsear_noticias_bing(portal, conteudo, backend)
+    return scraper_avancado.parsear_noticias_portal(portal, conteudo, backend)
+
+def normalizar(noticias):
+    return [{k: v for k, v in n.items() if k not in CAMPOS_VOLATEIS} for n in noticias]
+
+def medir(funcao, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        funcao()
+        tempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tempos)
+
+def conferir_descoberta(conteudo, esperado):
+    """Confere se o container descoberto pela estrutura seleciona os mesmos elementos que ``esperado``"""
+    documento = criar_documento(conteudo, 'html.parser')
+    descoberto = descobrir_registros(IndiceDOM(documento))
+    if descoberto is None:
+        print(f"   descoberta   nenhum container | esperado {esperado} | DIVERGENTE")
+        return False
+    selecionados = documento.select(descoberto['pattern'])
+    referencia = documento.select(esperado)
+    identico = [id(e) for e in selecionados] == [id(e) for e in referencia]
+    print(f"   descoberta   {descoberto['pattern']} ({len(selecionados)} elementos) | "
+          f"esperado {esperado} ({len(referencia)}) | {'idêntico' if identico else 'DIVERGENTE'}")
+    return identico
+
+def executar(fixtures, repeticoes):
+    backends = backends_disponiveis()
+    print(f"Backends disponíveis: {', '.join(backends)}")
+    divergencias = 0
+
+    for caminho, nome_portal in fixtures.items():
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+        portal = obter_portal(nome_portal)
+
+        print(f"\n📄 {caminho} ({len(conteudo) / 1024:.0f} KB) → {nome_portal}")
+        referencia = normalizar(extrair(portal, conteudo, 'html.parser'))
+        if not referencia:
+            print("   ⚠️  Nenhuma notícia no html.parser: a comparação entre backends não confere nada")
+
+        for backend in backends:
+            parse_ms = medir(lambda: criar_documento(conteudo, backend), repeticoes)
+            total_ms = medir(lambda: extrair(portal, conteudo, backend), repeticoes)
+            noticias = normalizar(extrair(portal, conteudo, backend))
+
+            identico = noticias == referencia
+            if not identico:
+                divergencias += 1
+
+            print(f"   {backend:<12} parse {parse_ms:8.2f} ms | extração {total_ms:8.2f} ms | "
+                  f"{len(noticias)} notícias | {'idêntico' if identico else 'DIVERGENTE'}")
+
+        esperado = REGISTROS_ESPERADOS.get(caminho)
+        if esperado and not conferir_descoberta(conteudo, esperado):
+            divergencias += 1
+
+    return divergencias
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixtures', nargs='*', help='arquivos HTML (padrão: páginas de debug salvas)')
+    parser.add_argument('--portal', default='Bem Paraná', help='portal usado para arquivos passados na linha de comando')
+    parser.add_argument('-n', '--repeticoes', type=int, default=5)
+    args = parser.parse_args()
+
+    os.chdir(RAIZ)
+    if args.fixtures:
+        fixtures = {caminho: args.portal for caminho in args.fixtures}
+    else:
+        fixtures = {caminho: portal for caminho, portal in FIXTURES.items() if os.path.exists(caminho)}
+
+    if not fixtures:
+        raise SystemExit("Nenhuma página salva encontrada")
+
+    return 1 if executar(fixtures, args.repeticoes) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
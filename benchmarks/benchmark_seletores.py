@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Micro-benchmark da extração por container
+Compara os seletores CSS em texto (interpretados a cada chamada) com o
+plano de seletores pré-compilado de cada portal
+"""
+
+import argparse
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import scraper_avancado  # noqa: E402
+from parser_html import criar_documento, plano_seletores  # noqa: E402
+
+CAMPOS = ('titulo', 'link', 'resumo', 'imagem', 'data')
+
+def extrair_campos(container, seletores):
+    return [container.select_one(seletores[campo]) for campo in CAMPOS]
+
+def medir(containers, seletores, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        for container in containers:
+            extrair_campos(container, seletores)
+    total = time.perf_counter() - inicio
+    return total / (repeticoes * len(containers)) * 1_000_000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('fixture', nargs='?', default='backend/bem_parana_busca_debug.html')
+    parser.add_argument('-n', '--repeticoes', type=int, default=200)
+    parser.add_argument('--backend', default='html.parser')
+    args = parser.parse_args()
+
+    os.chdir(RAIZ)
+    with open(args.fixture, 'rb') as f:
+        documento = criar_documento(f.read(), args.backend)
+
+    print(f"📄 {args.fixture} ({args.backend}), {args.repeticoes} repetições")
+    for portal in scraper_avancado.PORTAIS_PARCEIROS:
+        containers = documento.select(portal['selectors']['container'])
+        if not containers:
+            continue
+
+        texto_us = medir(containers, portal['selectors'], args.repeticoes)
+        plano_us = medir(containers, plano_seletores(portal), args.repeticoes)
+        print(f"   {portal['nome']:<28} {len(containers):3} containers | "
+              f"texto {texto_us:7.1f} µs | plano {plano_us:7.1f} µs | {texto_us / plano_us:4.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark offline da coleta com páginas gravadas dos portais
+
+    python benchmarks/replay.py gravar      # baixa a busca de cada portal para fixtures/
+    python benchmarks/replay.py executar    # reproduz o corpus sem acesso à rede
+
+A reprodução passa pelo mesmo caminho de extrair_noticias_portal /
+extrair_noticias_bing, com uma sessão que responde a partir do corpus,
+e informa notícias/s, percentis de latência por etapa e o pico de RSS.
+
+Cada estilo de seletor de PORTAIS_PARCEIROS tem no corpus uma página que
+extrai notícias; as que não foram gravadas com ``gravar`` reproduzem a
+marcação que os seletores do portal esperam e estão marcadas no corpus
+com ``"sintetico": true`` (e ``gravadoEm`` nulo). Regrave-as quando houver
+acesso aos portais.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import time
+import unicodedata
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+import requests
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+import scraper_avancado  # noqa: E402
+
+DIRETORIO_FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+ARQUIVO_CORPUS = os.path.join(DIRETORIO_FIXTURES, 'corpus.json')
+
+ETAPAS = ('parseMs', 'extracaoMs', 'totalMs')
+
+class RespostaGravada:
+    """Resposta HTTP mínima montada a partir de uma página do corpus"""
+
+    def __init__(self, url, conteudo, status_code=200):
+        self.url = url
+        self.content = conteudo
+        self.status_code = status_code
+        self.headers = {}
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} para {self.url}", response=self)
+
+class SessaoGravada:
+    """Substitui a sessão HTTP respondendo com as páginas gravadas"""
+
+    def __init__(self, paginas):
+        self.paginas = paginas
+        self.headers = {}
+
+    def get(self, url, **kwargs):
+        conteudo = self.paginas.get(url)
+        if conteudo is None:
+            return RespostaGravada(url, b'', 404)
+        return RespostaGravada(url, conteudo)
+
+def slug(nome):
+    texto = unicodedata.normalize('NFKD', nome).encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', texto.lower()).strip('-')
+
+def carregar_corpus():
+    with open(ARQUIVO_CORPUS, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def gravar(args):
+    """Grava a página de busca de cada portal de PORTAIS_PARCEIROS"""
+    os.makedirs(DIRETORIO_FIXTURES, exist_ok=True)
+    try:
+        corpus = carregar_corpus()
+    except (OSError, ValueError):
+        corpus = {}
+
+    sessao = scraper_avancado.criar_sessao()
+    for portal in scraper_avancado.PORTAIS_PARCEIROS:
+        arquivo = f"{slug(portal['nome'])}.html"
+        print(f"📡 {portal['nome']}: {portal['busca']}")
+        try:
+            response = sessao.get(portal['busca'], timeout=20)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            print(f"   ❌ {e}")
+            continue
+
+        with open(os.path.join(DIRETORIO_FIXTURES, arquivo), 'wb') as f:
+            f.write(response.content)
+        corpus[portal['nome']] = {
+            "busca": portal['busca'],
+            "arquivo": arquivo,
+            "gravadoEm": datetime.now().isoformat(),
+            "sintetico": False,
+            "bytes": len(response.content)
+        }
+        print(f"   💾 {arquivo} ({len(response.content) / 1024:.0f} KB)")
+
+    with open(ARQUIVO_CORPUS, 'w', encoding='utf-8') as f:
+        json.dump(corpus, f, ensure_ascii=False, indent=2)
+    print(f"\n📁 Corpus com {len(corpus)} portais em {ARQUIVO_CORPUS}")
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    posicao = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados)) - 1))
+    return ordenados[posicao]
+
+def pico_rss_mb():
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa em KB, macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+def executar(args):
+    """Reproduz o corpus pelo caminho de extração e mede o desempenho"""
+    if args.backend:
+        os.environ['SCRAPER_PARSER'] = args.backend
+
+    corpus = carregar_corpus()
+    portais = {p['nome']: p for p in scraper_avancado.PORTAIS_PARCEIROS}
+    paginas, selecionados = {}, []
+    for nome, entrada in corpus.items():
+        if nome not in portais:
+            print(f"⚠️  {nome} não está mais em PORTAIS_PARCEIROS, ignorado")
+            continue
+        with open(os.path.join(DIRETORIO_FIXTURES, entrada['arquivo']), 'rb') as f:
+            paginas[entrada['busca']] = f.read()
+        # A página gravada responde pela URL de busca atual do portal
+        paginas[portais[nome]['busca']] = paginas[entrada['busca']]
+        selecionados.append(portais[nome])
+
+    sessao = SessaoGravada(paginas)
+    metricas = []
+    total_itens = 0
+
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(args.repeticoes):
+            for portal in selecionados:
+                registro = scraper_avancado.RegistroMetricas(sondar=False)  # sem rede, sem sonda de DNS
+                metrica = registro.iniciar(portal)
+                noticias = scraper_avancado.extrair_noticias_portal(portal, sessao, None, metrica)
+                registro.concluir(metrica, noticias)
+                metricas.append(metrica)
+                total_itens += len(noticias)
+    duracao = time.perf_counter() - inicio
+
+    print(f"🔁 {len(selecionados)} portais x {args.repeticoes} repetições em {duracao:.2f} s")
+    print(f"   {total_itens / duracao:,.0f} notícias/s | {len(metricas) / duracao:,.1f} páginas/s")
+    print(f"\n   {'etapa':<12} {'p50':>8} {'p90':>8} {'p99':>8}  (ms)")
+    for etapa in ETAPAS:
+        valores = [m[etapa] for m in metricas if m.get(etapa) is not None]
+        print(f"   {etapa:<12} {percentil(valores, 50):8.2f} {percentil(valores, 90):8.2f} {percentil(valores, 99):8.2f}")
+
+    print(f"\n   {'portal':<28} {'itens':>5} {'parse p50':>10} {'extr p50':>9}")
+    for portal in selecionados:
+        doportal = [m for m in metricas if m['portal'] == portal['nome']]
+        marca = '*' if corpus[portal['nome']].get('sintetico') else ' '
+        print(f"   {portal['nome'][:27]:<27}{marca} {doportal[0]['itens']:>5} "
+              f"{percentil([m['parseMs'] or 0 for m in doportal], 50):10.2f} "
+              f"{percentil([m['extracaoMs'] or 0 for m in doportal], 50):9.2f}")
+    if any(corpus[portal['nome']].get('sintetico') for portal in selecionados):
+        print("   * página sintética, não gravada do portal")
+
+    rss = pico_rss_mb()
+    if rss is not None:
+        print(f"\n   Pico de RSS: {rss:.1f} MB")
+
+    erros = [m for m in metricas if m['erro']]
+    if erros:
+        print(f"\n⚠️  {len(erros)} execuções com erro: {sorted({m['erro'] for m in erros})}")
+        return 1
+    return 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark offline da coleta de notícias")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    comandos.add_parser('gravar', help='grava a página de busca de cada portal')
+
+    reproduzir = comandos.add_parser('executar', help='reproduz o corpus gravado')
+    reproduzir.add_argument('-n', '--repeticoes', type=int, default=20)
+    reproduzir.add_argument('--backend', help='backend de parsing (selectolax, lxml, html.parser)')
+
+    args = parser.parse_args()
+    if args.comando == 'gravar':
+        return gravar(args)
+    return executar(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
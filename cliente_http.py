@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Camada HTTP compartilhada do scraper, do analisador e dos scripts de teste
+Sessões com pool de conexões configurável, cabeçalhos por portal e HTTP/2
+(via httpx) quando disponível
+"""
+
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import h2  # noqa: F401
+    import httpx
+    HTTP2_DISPONIVEL = True
+except ImportError:
+    httpx = None
+    HTTP2_DISPONIVEL = False
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+
+CABECALHOS_PADRAO = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'pt-BR,pt;q=0.8,en;q=0.5,en-US;q=0.3',
+    'Accept-Encoding': 'gzip, deflate',
+}
+
+# Quantos hosts diferentes ficam no pool e quantas conexões por host
+POOL_CONEXOES = 16
+POOL_POR_HOST = 8
+
+_sessao_compartilhada = None
+_trava_sessao = threading.Lock()
+
+class RespostaHTTP2:
+    """Resposta do httpx com a interface de requests.Response usada no projeto"""
+
+    def __init__(self, resposta):
+        self._resposta = resposta
+        self.status_code = resposta.status_code
+        self.headers = resposta.headers
+        self.url = str(resposta.url)
+
+    @property
+    def content(self):
+        return self._resposta.content
+
+    @property
+    def text(self):
+        return self._resposta.text
+
+    @property
+    def elapsed(self):
+        return self._resposta.elapsed
+
+    def iter_content(self, chunk_size=1):
+        conteudo = self.content
+        for inicio in range(0, len(conteudo), chunk_size):
+            yield conteudo[inicio:inicio + chunk_size]
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+    def close(self):
+        self._resposta.close()
+
+class SessaoHTTP2:
+    """Sessão sobre httpx (HTTP/2) compatível com a parte de requests.Session usada
+
+    Erros de transporte viram as exceções equivalentes do requests, para que
+    o tratamento de erros e as novas tentativas funcionem igual nas duas
+    implementações. O corpo é sempre lido por inteiro (``stream`` é ignorado).
+    """
+
+    def __init__(self, pool_conexoes=POOL_CONEXOES, pool_por_host=POOL_POR_HOST):
+        limite = pool_conexoes * pool_por_host
+        self._cliente = httpx.Client(
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=limite, max_keepalive_connections=limite),
+        )
+        self.headers = self._cliente.headers
+
+    def request(self, metodo, url, headers=None, timeout=None, stream=False, **kwargs):
+        try:
+            resposta = self._cliente.request(
+                metodo, url, headers=headers,
+                timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+                **kwargs
+            )
+        except httpx.TimeoutException as e:
+            raise requests.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.ConnectionError(str(e)) from e
+        return RespostaHTTP2(resposta)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url, data=None, **kwargs):
+        return self.request('POST', url, data=data, **kwargs)
+
+    def close(self):
+        self._cliente.close()
+
+def usar_http2(http2=None):
+    """HTTP/2 é usado se pedido (ou não desligado por SCRAPER_HTTP2=0) e disponível"""
+    if http2 is None:
+        http2 = os.environ.get('SCRAPER_HTTP2', '1') != '0'
+    return http2 and HTTP2_DISPONIVEL
+
+def criar_sessao(pool_conexoes=POOL_CONEXOES, pool_por_host=POOL_POR_HOST, http2=None, headers=None):
+    """Cria uma sessão HTTP com pool de conexões e os cabeçalhos padrão"""
+    cabecalhos = dict(CABECALHOS_PADRAO, **(headers or {}))
+
+    if usar_http2(http2):
+        sessao = SessaoHTTP2(pool_conexoes, pool_por_host)
+    else:
+        sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=pool_conexoes, pool_maxsize=pool_por_host)
+        sessao.mount('http://', adaptador)
+        sessao.mount('https://', adaptador)
+        # Em HTTP/2 cabeçalhos de conexão são proibidos; no HTTP/1.1 mantêm o keep-alive
+        cabecalhos['Connection'] = 'keep-alive'
+
+    sessao.headers.update(cabecalhos)
+    return sessao
+
+def obter_sessao():
+    """Sessão compartilhada pelo processo, reaproveitando conexões entre portais e coletas"""
+    global _sessao_compartilhada
+    with _trava_sessao:
+        if _sessao_compartilhada is None:
+            _sessao_compartilhada = criar_sessao()
+        return _sessao_compartilhada
+
+def cabecalhos_portal(portal):
+    """Cabeçalhos extras definidos na configuração do portal (chave ``headers``)"""
+    return dict(portal.get('headers') or {})
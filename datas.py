@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Normalização das datas das notícias
+Converte o texto livre do campo "data" (datas em português, relativas como
+"há 2 horas", atributos <time datetime> e o formato curto do Bing, "2h")
+em timestamps ISO no fuso de Brasília
+"""
+
+import re
+import threading
+from datetime import datetime, timedelta, timezone
+
+from deduplicacao import remover_acentos
+
+try:
+    from zoneinfo import ZoneInfo
+    FUSO = ZoneInfo('America/Sao_Paulo')
+except Exception:  # sem base de fusos (tzdata) no sistema
+    FUSO = timezone(timedelta(hours=-3))
+
+MESES = {
+    'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+    'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12,
+    # abreviações em inglês que o Bing usa em algumas páginas
+    'feb': 2, 'apr': 4, 'may': 5, 'aug': 8, 'sep': 9, 'oct': 10, 'dec': 12,
+}
+
+# Nomes e abreviações aceitos para cada mês; o grupo capturado começa pela chave de MESES
+NOMES_MESES = (
+    'jan(?:eiro|uary)?', 'fev(?:ereiro)?', 'feb(?:ruary)?', 'mar(?:co|ch)?', 'abr(?:il)?', 'apr(?:il)?',
+    'mai(?:o)?', 'may', 'jun(?:ho|e)?', 'jul(?:ho|y)?', 'ago(?:sto)?', 'aug(?:ust)?',
+    'set(?:embro)?', 'sep(?:t|tember)?', 'out(?:ubro)?', 'oct(?:ober)?', 'nov(?:embro|ember)?',
+    'dez(?:embro)?', 'dec(?:ember)?',
+)
+
+# Unidade relativa -> (segundos, precisão do resultado)
+UNIDADES = {
+    's': (1, 'minuto'), 'seg': (1, 'minuto'), 'segundo': (1, 'minuto'), 'segundos': (1, 'minuto'),
+    'm': (60, 'minuto'), 'min': (60, 'minuto'), 'mins': (60, 'minuto'),
+    'minuto': (60, 'minuto'), 'minutos': (60, 'minuto'),
+    'minute': (60, 'minuto'), 'minutes': (60, 'minuto'),
+    'h': (3600, 'hora'), 'hr': (3600, 'hora'), 'hrs': (3600, 'hora'), 'hora': (3600, 'hora'), 'horas': (3600, 'hora'),
+    'hour': (3600, 'hora'), 'hours': (3600, 'hora'),
+    'd': (86400, 'dia'), 'dia': (86400, 'dia'), 'dias': (86400, 'dia'), 'day': (86400, 'dia'), 'days': (86400, 'dia'),
+    'sem': (604800, 'dia'), 'semana': (604800, 'dia'), 'semanas': (604800, 'dia'),
+    'w': (604800, 'dia'), 'week': (604800, 'dia'), 'weeks': (604800, 'dia'),
+    'mes': (2592000, 'dia'), 'meses': (2592000, 'dia'), 'mo': (2592000, 'dia'),
+    'ano': (31536000, 'dia'), 'anos': (31536000, 'dia'), 'y': (31536000, 'dia'),
+}
+
+_HORA = r'(?:\D{0,6}?(\d{1,2})[:h](\d{2}))?'
+_MES = r'(' + '|'.join(NOMES_MESES) + r')\b\.?'
+_UNIDADES = '|'.join(sorted(UNIDADES, key=len, reverse=True))
+
+# Padrões aplicados ao texto sem acentos e em minúsculas
+PADROES = (
+    ('iso', re.compile(
+        r'\b(\d{4})-(\d{2})-(\d{2})(?:[t ](\d{2}):(\d{2})(?::\d{2}(?:\.\d+)?)?(z|[+-]\d{2}:?\d{2})?)?'
+    )),
+    ('numerica', re.compile(r'\b(\d{1,2})[/.-](\d{1,2})[/.-](\d{4}|\d{2})\b' + _HORA)),
+    ('extenso', re.compile(
+        r'\b(\d{1,2})o?\s+(?:de\s+)?' + _MES +
+        r'(?:,?\s+(?:de\s+)?(\d{4}))?' + _HORA
+    )),
+    # Mês antes do dia, como o Bing em inglês: "Oct 17, 2026", "Sep 3"
+    # (mas não "dez 10 anos", em que "dez" é o número)
+    ('mes_dia', re.compile(
+        r'\b' + _MES + r'\s+(\d{1,2})(?:st|nd|rd|th)?\b(?!:|\s*(?:' + _UNIDADES + r')\b)'
+        r'(?:,?\s+(\d{4}))?' + _HORA
+    )),
+    # "há 2 horas", "2h" (texto inteiro) ou "1 ano atrás" / "3 days ago"
+    ('relativa', re.compile(
+        r'(?:^|\bha\s+|\b(?=\d+\s*(?:' + _UNIDADES + r')\b\.?\s+(?:atras|ago)\b))'
+        r'(\d+)\s*(' + _UNIDADES + r')\b\.?(?:\s+(?:atras|ago))?'
+    )),
+    ('palavra', re.compile(r'\b(agora|hoje|ontem|anteontem|just now|today|yesterday)\b' + _HORA)),
+)
+
+DIAS_PALAVRA = {
+    'agora': 0, 'just now': 0, 'hoje': 0, 'today': 0,
+    'ontem': 1, 'yesterday': 1, 'anteontem': 2,
+}
+
+# Ordem de tentativa dos padrões por portal: o último que funcionou vem primeiro
+_ordem_portal = {}
+_trava_ordem = threading.Lock()
+
+def agora():
+    return datetime.now(FUSO)
+
+def _montar(ano, mes, dia, hora=None, minuto=None):
+    try:
+        return datetime(int(ano), int(mes), int(dia), int(hora or 0), int(minuto or 0), tzinfo=FUSO)
+    except ValueError:
+        return None
+
+def _interpretar(tipo, encontrado, referencia):
+    grupos = encontrado.groups()
+    if tipo == 'iso':
+        *campos, deslocamento = grupos
+        data = _montar(*campos)
+        if data is None or deslocamento is None:
+            return data
+        # "z" ou "+hh:mm": o horário está nesse fuso, não no de Brasília
+        if deslocamento == 'z':
+            fuso = timezone.utc
+        else:
+            sinal = -1 if deslocamento[0] == '-' else 1
+            horas, minutos = int(deslocamento[1:3]), int(deslocamento[-2:])
+            fuso = timezone(sinal * timedelta(hours=horas, minutes=minutos))
+        return data.replace(tzinfo=fuso).astimezone(FUSO)
+
+    if tipo == 'numerica':
+        dia, mes, ano, hora, minuto = grupos
+        ano = int(ano) + 2000 if len(ano) == 2 else ano
+        return _montar(ano, mes, dia, hora, minuto)
+
+    if tipo in ('extenso', 'mes_dia'):
+        if tipo == 'extenso':
+            dia, mes, ano, hora, minuto = grupos
+        else:
+            mes, dia, ano, hora, minuto = grupos
+        data = _montar(ano or referencia.year, MESES[mes[:3]], dia, hora, minuto)
+        if data is not None and ano is None and data > referencia + timedelta(days=1):
+            data = data.replace(year=data.year - 1)  # "28 de dezembro" lido em janeiro
+        return data
+
+    if tipo == 'relativa':
+        quantidade, unidade = grupos
+        segundos, precisao = UNIDADES[unidade]
+        data = referencia - timedelta(seconds=int(quantidade) * segundos)
+        # Arredondar evita que a mesma notícia mude de data a cada coleta
+        if precisao == 'dia':
+            return data.replace(hour=0, minute=0, second=0, microsecond=0)
+        if precisao == 'hora':
+            return data.replace(minute=0, second=0, microsecond=0)
+        return data.replace(second=0, microsecond=0)
+
+    palavra, hora, minuto = grupos
+    dia = referencia - timedelta(days=DIAS_PALAVRA[palavra])
+    if hora is not None:
+        return _montar(dia.year, dia.month, dia.day, hora, minuto)
+    if palavra in ('agora', 'just now'):
+        return referencia.replace(second=0, microsecond=0)
+    return _montar(dia.year, dia.month, dia.day)
+
+def ler_atributo_datetime(valor):
+    """Valor de <time datetime="..."> como datetime com fuso (None se inválido)"""
+    if not valor:
+        return None
+    try:
+        data = datetime.fromisoformat(valor.strip().replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    return data if data.tzinfo is not None else data.replace(tzinfo=FUSO)
+
+def interpretar_data(texto, atributo=None, portal=None, referencia=None):
+    """Converte a data de uma notícia em datetime com fuso (None se não reconhecida)
+
+    O atributo ``datetime`` de um elemento <time>, quando existe, tem
+    prioridade sobre o texto. ``portal`` é o nome usado no cache da ordem
+    dos padrões; ``referencia`` é o momento da coleta (padrão: agora).
+    """
+    data = ler_atributo_datetime(atributo)
+    if data is not None:
+        return data.astimezone(FUSO)
+    if not texto:
+        return None
+
+    texto = remover_acentos(texto).strip()
+    referencia = referencia or agora()
+
+    with _trava_ordem:
+        ordem = list(_ordem_portal.get(portal, range(len(PADROES))))
+    for posicao, indice in enumerate(ordem):
+        tipo, padrao = PADROES[indice]
+        encontrado = padrao.search(texto)
+        if encontrado is None:
+            continue
+        data = _interpretar(tipo, encontrado, referencia)
+        if data is None:
+            continue
+        if posicao and portal is not None:
+            with _trava_ordem:
+                _ordem_portal[portal] = [indice] + [i for i in ordem if i != indice]
+        return data
+    return None
+
+def normalizar_data(texto, atributo=None, portal=None, referencia=None):
+    """Data da notícia em ISO 8601 com fuso, ou None"""
+    data = interpretar_data(texto, atributo, portal, referencia)
+    return data.isoformat(timespec='seconds') if data is not None else None
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Detecção de notícias quase duplicadas entre portais
+MinHash sobre shingles de palavras de titulo + resumo, com índice LSH
+para comparar apenas candidatos prováveis
+"""
+
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+
+NUM_PERMUTACOES = 64
+BANDAS = 16  # 16 bandas x 4 linhas: pares com Jaccard acima de ~0.5 viram candidatos
+LINHAS_POR_BANDA = NUM_PERMUTACOES // BANDAS
+LIMIAR_SIMILARIDADE = 0.5
+TAMANHO_SHINGLE = 3
+
+_PRIMO = (1 << 61) - 1
+_MASCARA = (1 << 32) - 1
+_RE_PALAVRA = re.compile(r'\w+')
+
+# Coeficientes fixos para que as assinaturas sejam iguais entre execuções
+_gerador = random.Random(20240901)
+_COEFICIENTES = [
+    (_gerador.randrange(1, _PRIMO), _gerador.randrange(0, _PRIMO))
+    for _ in range(NUM_PERMUTACOES)
+]
+
+def remover_acentos(texto):
+    """Remove acentos e converte para minúsculas"""
+    decomposto = unicodedata.normalize('NFKD', texto or '')
+    return ''.join(c for c in decomposto if not unicodedata.combining(c)).lower()
+
+def shingles(texto, tamanho=TAMANHO_SHINGLE):
+    """Conjunto de sequências de ``tamanho`` palavras do texto normalizado"""
+    palavras = _RE_PALAVRA.findall(remover_acentos(texto))
+    if len(palavras) < tamanho:
+        return {' '.join(palavras)} if palavras else set()
+    return {' '.join(palavras[i:i + tamanho]) for i in range(len(palavras) - tamanho + 1)}
+
+def assinatura_minhash(conjunto):
+    """Assinatura MinHash de um conjunto de shingles"""
+    if not conjunto:
+        return None
+    valores = [zlib.crc32(s.encode('utf-8')) & _MASCARA for s in conjunto]
+    return tuple(
+        min((a * x + b) % _PRIMO for x in valores)
+        for a, b in _COEFICIENTES
+    )
+
+def similaridade(assinatura_a, assinatura_b):
+    """Estimativa de Jaccard a partir de duas assinaturas MinHash"""
+    iguais = sum(1 for a, b in zip(assinatura_a, assinatura_b) if a == b)
+    return iguais / NUM_PERMUTACOES
+
+def prioridade_fonte(noticia):
+    """Chave de ordenação: menor valor = cópia mais bem apurada da notícia"""
+    return (
+        noticia.get('tipoFonte') == 'bing_news',  # portal parceiro antes de agregador
+        'via.placeholder.com' in (noticia.get('imagem') or ''),  # imagem real antes de placeholder
+        -len(noticia.get('resumo') or ''),
+    )
+
+def agrupar_duplicatas(noticias, limiar=LIMIAR_SIMILARIDADE):
+    """Agrupa os índices das notícias que parecem ser a mesma matéria"""
+    assinaturas = [
+        assinatura_minhash(shingles(f"{n.get('titulo', '')} {n.get('resumo', '')}"))
+        for n in noticias
+    ]
+
+    # Índice LSH: só notícias que coincidem em alguma banda são comparadas
+    baldes = defaultdict(list)
+    for indice, assinatura in enumerate(assinaturas):
+        if assinatura is None:
+            continue
+        for banda in range(BANDAS):
+            inicio = banda * LINHAS_POR_BANDA
+            baldes[(banda, assinatura[inicio:inicio + LINHAS_POR_BANDA])].append(indice)
+
+    pais = list(range(len(noticias)))
+
+    def raiz(i):
+        while pais[i] != i:
+            pais[i] = pais[pais[i]]
+            i = pais[i]
+        return i
+
+    comparados = set()
+    for candidatos in baldes.values():
+        for posicao, i in enumerate(candidatos):
+            for j in candidatos[posicao + 1:]:
+                if (i, j) in comparados:
+                    continue
+                comparados.add((i, j))
+                if similaridade(assinaturas[i], assinaturas[j]) >= limiar:
+                    pais[raiz(j)] = raiz(i)
+
+    grupos = defaultdict(list)
+    for indice in range(len(noticias)):
+        grupos[raiz(indice)].append(indice)
+    return list(grupos.values())
+
+def remover_duplicatas(noticias, limiar=LIMIAR_SIMILARIDADE):
+    """Mantém uma cópia de cada matéria, preferindo a fonte mais bem apurada
+
+    A ordem original das notícias mantidas é preservada.
+    """
+    manter = set()
+    for grupo in agrupar_duplicatas(noticias, limiar):
+        manter.add(min(grupo, key=lambda i: (prioridade_fonte(noticias[i]), i)))
+    return [n for i, n in enumerate(noticias) if i in manter]
@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Descoberta de seletores a partir de um índice do DOM
+O documento é percorrido uma única vez para montar índices por tag e por
+classe e os vetores de características de cada subárvore; containers e
+seletores de campos são pontuados a partir desses índices. Sem padrões
+conhecidos, os registros da lista de notícias são encontrados pela
+estrutura: irmãos com a mesma forma (tags e classes), como no MDR/DEPTA
+"""
+
+import re
+from collections import Counter, defaultdict
+from functools import lru_cache
+from itertools import accumulate, product
+
+from parser_html import percorrer_elementos
+
+TITULOS_OU_LINK = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'a'))
+
+# Posições no vetor de características de uma subárvore (apenas descendentes)
+TITULOS_E_LINKS, LINKS_COM_HREF, IMAGENS, TAMANHO_TEXTO = range(4)
+
+# Descoberta estrutural de registros repetidos
+MIN_REGISTROS = 3
+PROFUNDIDADE_FORMA = 3  # níveis abaixo do registro considerados na sua forma
+SIMILARIDADE_MINIMA = 0.5  # Jaccard mínimo entre a forma do registro e a do grupo
+TEXTO_MINIMO_REGISTRO = 40  # menus e listas de tags têm pouco texto por item
+MAX_LINKS_REGISTRO = 8  # acima disso o "registro" é um bloco com várias notícias
+NIVEIS_CAMINHO = 3  # ancestrais que podem entrar no seletor do registro
+MAX_CLASSES_SELETOR = 2  # classes de cada elemento testadas no seletor
+
+MESES_ABREVIADOS = ('jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez')
+
+_RE_SIMPLES = re.compile(r'^(?:([a-zA-Z][\w-]*)|\.([\w-]+)|\[class\*="([^"]+)"\])$')
+
+class IndiceDOM:
+    """Índice de um documento, montado em uma única passagem
+
+    Os elementos ficam numerados em pré-ordem; a subárvore do elemento
+    ``i`` ocupa as posições ``i + 1`` até ``fim[i] - 1``. As características
+    de cada elemento (títulos e links, links com href, imagens e tamanho
+    do texto) são guardadas como somas acumuladas, então o vetor de
+    qualquer subárvore sai de duas subtrações.
+    """
+
+    def __init__(self, documento):
+        self.nos = []
+        self.tags = []
+        self.classes = []
+        self.pais = []
+        self.profundidades = []
+        self.fim = []
+        self.por_tag = defaultdict(list)
+        self.por_atributo_classe = defaultdict(list)  # atributo class completo -> elementos
+        self.por_classe = defaultdict(list)  # token de classe -> elementos
+
+        caracteristicas = ([], [], [], [])
+        titulos_links, links_href, imagens, textos = caracteristicas
+        abertos = []
+
+        for no, tag, classe, profundidade, texto in percorrer_elementos(documento):
+            indice = len(self.nos)
+            while len(abertos) >= profundidade:
+                self.fim[abertos.pop()] = indice
+
+            self.nos.append(no)
+            self.tags.append(tag)
+            self.classes.append(classe)
+            self.pais.append(abertos[-1] if abertos else -1)
+            self.profundidades.append(profundidade)
+            self.fim.append(None)
+            titulos_links.append(tag in TITULOS_OU_LINK)
+            links_href.append(tag == 'a' and no.get('href') is not None)
+            imagens.append(tag == 'img')
+            textos.append(texto)
+
+            self.por_tag[tag].append(indice)
+            if classe:
+                self.por_atributo_classe[classe].append(indice)
+            abertos.append(indice)
+
+        for indice in abertos:
+            self.fim[indice] = len(self.nos)
+
+        # Classes repetem muito; os tokens saem dos atributos distintos
+        for classe, indices in self.por_atributo_classe.items():
+            for token in set(classe.split()):
+                self.por_classe[token].extend(indices)
+        for indices in self.por_classe.values():
+            indices.sort()
+
+        self._acumulados = [list(accumulate(valores, initial=0)) for valores in caracteristicas]
+
+    def vetor(self, indice, proprio=False):
+        """Características somadas dos descendentes de ``indice`` (e dele mesmo, com ``proprio``)"""
+        inicio, fim = (indice if proprio else indice + 1), self.fim[indice]
+        return [acumulado[fim] - acumulado[inicio] for acumulado in self._acumulados]
+
+    def __len__(self):
+        return len(self.nos)
+
+    # Seletores
+
+    def elementos_simples(self, seletor):
+        """Elementos de um seletor simples (tag, .classe ou [class*="x"]) em ordem do documento
+
+        Resolvido só pelos índices, sem percorrer o documento. Retorna
+        None se o seletor não for de um desses tipos.
+        """
+        encontrado = _RE_SIMPLES.match(seletor.strip())
+        if not encontrado:
+            return None
+        tag, classe, trecho = encontrado.groups()
+        if tag:
+            return self.por_tag.get(tag.lower(), [])
+        if classe:
+            return self.por_classe.get(classe, [])
+        elementos = []
+        for atributo, indices in self.por_atributo_classe.items():
+            if trecho in atributo:
+                elementos.extend(indices)
+        return sorted(elementos)
+
+    def _confere(self, indice, teste):
+        tipo, valor = teste
+        if tipo == 'tag':
+            return self.tags[indice] == valor
+        return valor in self.classes[indice].split()
+
+    def primeiro_em(self, raiz, seletor):
+        """Primeiro descendente de ``raiz`` que casa com ``seletor`` (ou None)
+
+        Aceita seletores de uma parte ou duas separadas por espaço
+        (descendente), cada parte uma tag ou uma .classe; como no soupsieve,
+        o ancestral pode estar fora da raiz.
+        """
+        partes = [_teste_parte(parte) for parte in seletor.split()]
+        if not partes or None in partes or len(partes) > 2:
+            raise ValueError(f"Seletor não suportado pelo índice: {seletor}")
+
+        alvo = partes[-1]
+        ancestral = partes[0] if len(partes) == 2 else None
+        for indice in range(raiz + 1, self.fim[raiz]):
+            if not self._confere(indice, alvo):
+                continue
+            if ancestral is None:
+                return indice
+            pai = self.pais[indice]
+            while pai >= 0:
+                if self._confere(pai, ancestral):
+                    return indice
+                pai = self.pais[pai]
+        return None
+
+def _teste_parte(parte):
+    if parte.startswith('.'):
+        return ('classe', parte[1:])
+    if re.match(r'^[a-zA-Z][\w-]*$', parte):
+        return ('tag', parte.lower())
+    return None
+
+def pontuar_container(indice, elementos):
+    """Pontuação de um padrão de container: quantidade de elementos mais o
+    conteúdo típico de notícia (títulos, links e imagens) do primeiro"""
+    vetor = indice.vetor(elementos[0])
+    return len(elementos) + vetor[TITULOS_E_LINKS] * 2 + vetor[IMAGENS] + vetor[LINKS_COM_HREF]
+
+def escolher_container(indice, padroes, minimo=2):
+    """Melhor padrão de container entre ``padroes`` (o primeiro vence empates)
+
+    Retorna um dict com ``pattern``, ``total``, ``primeiro`` (posição no
+    índice) e ``score``, ou None se nenhum padrão tiver ``minimo`` elementos.
+    """
+    melhor = None
+    for padrao in padroes:
+        elementos = indice.elementos_simples(padrao)
+        if elementos is None:
+            raise ValueError(f"Padrão de container não suportado pelo índice: {padrao}")
+        if len(elementos) < minimo:
+            continue
+        score = pontuar_container(indice, elementos)
+        if melhor is None or score > melhor['score']:
+            melhor = {'pattern': padrao, 'total': len(elementos), 'primeiro': elementos[0], 'score': score}
+    return melhor
+
+def elemento_serve(elemento, tipo):
+    """Indica se o primeiro elemento de um seletor parece o campo ``tipo``"""
+    texto = elemento.get_text().strip()
+    if tipo == 'título':
+        return 10 < len(texto) < 200
+    if tipo == 'resumo':
+        return len(texto) > 20
+    if tipo == 'link':
+        return bool(elemento.get('href'))
+    if tipo == 'imagem':
+        return bool(elemento.get('src'))
+    if tipo == 'data':
+        return bool(re.search(r'\d{1,2}[/\-]\d{1,2}', texto) or any(mes in texto.lower() for mes in MESES_ABREVIADOS))
+    return False
+
+def escolher_seletor(indice, raiz, padroes, tipo):
+    """Primeiro padrão cujo elemento dentro de ``raiz`` serve para o campo
+
+    Título e resumo exigem um elemento válido; nos demais campos, sem
+    elemento válido, vale o primeiro padrão que encontrar algum elemento.
+    """
+    for padrao in padroes:
+        encontrado = indice.primeiro_em(raiz, padrao)
+        if encontrado is None:
+            continue
+        if elemento_serve(indice.nos[encontrado], tipo) or tipo not in ('título', 'resumo'):
+            return padrao
+    return None
+
+# Descoberta estrutural
+
+_RE_INSTAVEL = re.compile(r'\d')
+_RE_IDENTIFICADOR = re.compile(r'^[a-zA-Z_][\w-]*$')
+
+@lru_cache(maxsize=4096)
+def classes_estaveis(classe):
+    """Tokens de classe que servem em seletores: sem números (``post-123``,
+    ``css-1x2y``), que costumam mudar de uma página ou build para outra"""
+    return tuple(sorted({t for t in classe.split() if _RE_IDENTIFICADOR.match(t) and not _RE_INSTAVEL.search(t)}))
+
+def forma(indice, raiz):
+    """Forma da subárvore: conjunto de (nível relativo, tag, classes estáveis)
+    dos descendentes até ``PROFUNDIDADE_FORMA`` níveis abaixo da raiz"""
+    base = indice.profundidades[raiz]
+    itens = set()
+    posicao, fim = raiz + 1, indice.fim[raiz]
+    while posicao < fim:
+        nivel = indice.profundidades[posicao] - base
+        itens.add((nivel, indice.tags[posicao], classes_estaveis(indice.classes[posicao])))
+        posicao = posicao + 1 if nivel < PROFUNDIDADE_FORMA else indice.fim[posicao]
+    return frozenset(itens)
+
+def _jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+def regioes_repetidas(indice):
+    """Grupos de irmãos com a mesma tag e forma parecida, em ordem do documento
+
+    A forma de cada irmão é comparada com o núcleo do grupo (os itens
+    presentes em pelo menos metade deles), o que tolera registros com um
+    campo opcional, como a imagem.
+    """
+    filhos = defaultdict(list)
+    for posicao, pai in enumerate(indice.pais):
+        filhos[pai].append(posicao)
+
+    regioes = []
+    for irmaos in filhos.values():
+        if len(irmaos) < MIN_REGISTROS:
+            continue
+        por_tag = defaultdict(list)
+        for posicao in irmaos:
+            por_tag[indice.tags[posicao]].append(posicao)
+        for membros in por_tag.values():
+            if len(membros) < MIN_REGISTROS:
+                continue
+            formas = [forma(indice, posicao) for posicao in membros]
+            frequencia = Counter(item for f in formas for item in f)
+            nucleo = {item for item, vezes in frequencia.items() if vezes * 2 >= len(membros)}
+            similares = [p for p, f in zip(membros, formas) if _jaccard(f, nucleo) >= SIMILARIDADE_MINIMA]
+            if len(similares) >= MIN_REGISTROS:
+                regioes.append(similares)
+    regioes.sort()
+    return regioes
+
+def pontuar_regiao(indice, registros):
+    """Quantidade de registros vezes o conteúdo de notícia médio de cada um
+
+    Regiões com pouco texto por registro (menus), sem links ou com links
+    demais (blocos que agrupam várias notícias) valem 0.
+    """
+    vetores = [indice.vetor(posicao, proprio=True) for posicao in registros]
+    total = len(vetores)
+    texto = sum(v[TAMANHO_TEXTO] for v in vetores) / total
+    links = sum(v[LINKS_COM_HREF] for v in vetores) / total
+    if texto < TEXTO_MINIMO_REGISTRO or not 1 <= links <= MAX_LINKS_REGISTRO:
+        return 0
+    riqueza = sum(min(v[TITULOS_E_LINKS], 4) * 2 + min(v[IMAGENS], 2) + min(v[LINKS_COM_HREF], 4) for v in vetores) / total
+    return round(total * (1 + riqueza), 3)
+
+def _irmaos(indice, posicoes):
+    """Filhos dos pais de ``posicoes`` com a mesma tag que elas (incluindo-as)"""
+    tags = {indice.tags[p] for p in posicoes}
+    irmaos = set()
+    for pai in {indice.pais[p] for p in posicoes}:
+        if pai < 0:
+            continue
+        filho = pai + 1
+        while filho < indice.fim[pai]:
+            if indice.tags[filho] in tags:
+                irmaos.add(filho)
+            filho = indice.fim[filho]
+    return irmaos | set(posicoes)
+
+def _ordem_token(indice, token, irmaos):
+    """Chave de ordenação das classes candidatas a seletor
+
+    Primeiro as presentes em mais irmãos (um registro de formato diferente,
+    como um post de vídeo sem imagem, continua na lista), depois os nomes
+    genéricos (``post`` antes de ``format-standard`` ou ``category-x``), os
+    mais raros no documento e os mais curtos.
+    """
+    presentes = sum(token in indice.classes[p].split() for p in irmaos)
+    return (-presentes, token.count('-') + token.count('_'), len(indice.por_classe.get(token, ())), len(token), token)
+
+def _parece_registro(indice, posicao):
+    """Critério de ``pontuar_regiao`` aplicado a um elemento só"""
+    vetor = indice.vetor(posicao, proprio=True)
+    return vetor[TAMANHO_TEXTO] >= TEXTO_MINIMO_REGISTRO and 1 <= vetor[LINKS_COM_HREF] <= MAX_LINKS_REGISTRO
+
+def _compostos(indice, posicoes, com_id=True):
+    """Seletores simples que descrevem todos os elementos de ``posicoes``, do mais curto ao mais longo"""
+    tags = {indice.tags[p] for p in posicoes}
+    tokens = set.intersection(*(set(classes_estaveis(indice.classes[p])) for p in posicoes))
+    opcoes = []
+    if com_id and len(posicoes) == 1:
+        identificador = indice.nos[posicoes[0]].get('id')
+        if identificador and _RE_IDENTIFICADOR.match(identificador) and not _RE_INSTAVEL.search(identificador):
+            opcoes.append(('#' + identificador, (None, None, identificador)))
+    # Todas as classes são pontuadas antes do corte; as demais não encurtam o seletor
+    irmaos = _irmaos(indice, posicoes)
+    tokens = sorted(tokens, key=lambda t: _ordem_token(indice, t, irmaos))[:MAX_CLASSES_SELETOR]
+    opcoes.extend(('.' + token, (None, token, None)) for token in tokens)
+    if len(tags) == 1:
+        tag = tags.pop()
+        opcoes.extend((f'{tag}.{token}', (tag, token, None)) for token in tokens)
+        opcoes.append((tag, (tag, None, None)))
+    return opcoes
+
+def _casa(indice, posicao, composto):
+    tag, token, identificador = composto
+    if tag is not None and indice.tags[posicao] != tag:
+        return False
+    if token is not None and token not in indice.classes[posicao].split():
+        return False
+    if identificador is not None and indice.nos[posicao].get('id') != identificador:
+        return False
+    return True
+
+def _elementos_caminho(indice, caminho):
+    """Elementos que casam com ``a > b > c`` (``caminho`` do ancestral ao registro)"""
+    tag, token, identificador = caminho[-1]
+    if token is not None:
+        candidatos = indice.por_classe.get(token, [])
+    elif tag is not None:
+        candidatos = indice.por_tag.get(tag, [])
+    else:
+        candidatos = range(len(indice))
+    encontrados = []
+    for posicao in candidatos:
+        atual = posicao
+        for composto in reversed(caminho):
+            if atual < 0 or not _casa(indice, atual, composto):
+                break
+            atual = indice.pais[atual]
+        else:
+            encontrados.append(posicao)
+    return encontrados
+
+def caminho_minimo(indice, registros):
+    """Seletor CSS mais curto que seleciona exatamente os ``registros``
+
+    Usa só classes e ids estáveis e, se a classe do registro não bastar,
+    acrescenta ancestrais com ``>`` (até ``NIVEIS_CAMINHO``). Irmãos dos
+    registros com a mesma tag que ficaram de fora só pela forma (com texto
+    e links de notícia) podem ser selecionados também. Se nenhum caminho for exato, fica o que
+    seleciona menos elementos a mais. Retorna (seletor, exato).
+    """
+    alvo = set(registros)
+    aceitos = alvo | {p for p in _irmaos(indice, registros) if _parece_registro(indice, p)}
+    niveis = [_compostos(indice, registros, com_id=False)]
+    ancestrais = list(registros)
+    for _ in range(NIVEIS_CAMINHO):
+        ancestrais = sorted({indice.pais[p] for p in ancestrais})
+        if -1 in ancestrais:
+            break
+        niveis.append(_compostos(indice, ancestrais))
+
+    melhor = None
+    for quantidade in range(1, len(niveis) + 1):
+        # Classes são mais estáveis do que a posição: partes só com tag por último
+        combinacoes = sorted(product(*reversed(niveis[:quantidade])),
+                             key=lambda c: (sum(composto[1] is None and composto[2] is None for _, composto in c),
+                                            sum(len(texto) for texto, _ in c), [texto for texto, _ in c]))
+        for combinacao in combinacoes:
+            encontrados = set(_elementos_caminho(indice, [composto for _, composto in combinacao]))
+            if not alvo <= encontrados:
+                continue
+            seletor = ' > '.join(texto for texto, _ in combinacao)
+            if encontrados <= aceitos:
+                return seletor, True
+            if melhor is None or len(encontrados) < melhor[0]:
+                melhor = (len(encontrados), seletor)
+    return (melhor[1], False) if melhor else (None, False)
+
+def descobrir_registros(indice):
+    """Container de notícias pela estrutura, sem padrões de classe conhecidos
+
+    Retorna um dict como o de ``escolher_container`` (``pattern``,
+    ``total``, ``primeiro``, ``score``) mais ``exato``, que indica se o
+    seletor seleciona só os registros; None se não houver região repetida
+    com cara de lista de notícias.
+    """
+    melhor = None
+    for registros in regioes_repetidas(indice):
+        score = pontuar_regiao(indice, registros)
+        if score and (melhor is None or score > melhor[0]):
+            melhor = (score, registros)
+    if melhor is None:
+        return None
+
+    score, registros = melhor
+    seletor, exato = caminho_minimo(indice, registros)
+    if seletor is None:
+        return None
+    return {'pattern': seletor, 'total': len(registros), 'primeiro': registros[0], 'score': score,
+            'exato': exato, 'registros': registros}
+
+def _composto_relativo(indice, posicao):
+    tokens = classes_estaveis(indice.classes[posicao])
+    if tokens:
+        return '.' + min(tokens, key=lambda t: (len(indice.por_classe.get(t, ())), t))
+    return indice.tags[posicao]
+
+def padroes_registros(indice, registros):
+    """Seletores de campos tirados dos próprios registros, por tipo
+
+    São a classe mais rara (ou a tag) dos descendentes presentes em pelo
+    menos metade dos registros e, para links e imagens, ``pai a`` e
+    ``pai img``; servem para portais cujas classes não estão nos padrões.
+    """
+    presentes = Counter()
+    ordem = {}
+    for registro in registros:
+        vistos = set()
+        for posicao in range(registro + 1, indice.fim[registro]):
+            chave = _composto_relativo(indice, posicao)
+            tag = indice.tags[posicao]
+            if tag in ('a', 'img'):
+                pai = indice.pais[posicao]
+                if pai != registro and _composto_relativo(indice, pai) != tag:
+                    vistos.add(f'{_composto_relativo(indice, pai)} {tag}')
+            vistos.add(chave)
+        for chave in vistos:
+            presentes[chave] += 1
+            ordem.setdefault(chave, (registro, len(ordem)))
+
+    frequentes = sorted((chave for chave, vezes in presentes.items() if vezes * 2 >= len(registros)),
+                        key=lambda chave: (-presentes[chave], ordem[chave]))
+    compostos = [c for c in frequentes if ' ' not in c]
+    links = [c for c in frequentes if c.endswith(' a')] + (['a'] if 'a' in presentes else [])
+    imagens = [c for c in frequentes if c.endswith(' img')] + (['img'] if 'img' in presentes else [])
+    return {'titulo': links, 'link': links, 'resumo': compostos, 'imagem': imagens, 'data': compostos}
+
+def escolher_seletor_registros(indice, registros, padroes, tipo):
+    """Padrão que serve para o campo no maior número de registros
+
+    Ao contrário de ``escolher_seletor``, que olha só o primeiro container,
+    cada padrão é avaliado em todos os registros e precisa servir em pelo
+    menos metade deles; empates ficam com o que vem antes em ``padroes``.
+    Resumos não podem conter links, para não escolher o registro inteiro.
+    """
+    melhor, melhor_vezes = None, 0
+    for padrao in dict.fromkeys(padroes):
+        vezes = 0
+        for registro in registros:
+            encontrado = indice.primeiro_em(registro, padrao)
+            if encontrado is None:
+                continue
+            if tipo == 'resumo' and indice.vetor(encontrado, proprio=True)[LINKS_COM_HREF]:
+                continue
+            if elemento_serve(indice.nos[encontrado], tipo):
+                vezes += 1
+        if vezes * 2 >= len(registros) and vezes > melhor_vezes:
+            melhor, melhor_vezes = padrao, vezes
+    return melhor
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Execução única (single-flight) das coletas
+Dentro do processo, chamadas simultâneas se juntam à execução em andamento
+e recebem o mesmo resultado; entre processos (cron, modo contínuo), uma
+trava em arquivo faz quem chega depois esperar a coleta em andamento
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import Future
+
+try:
+    import fcntl
+except ImportError:  # Windows: trava por criação exclusiva do arquivo
+    fcntl = None
+
+ARQUIVO_TRAVA = 'cache/coleta.lock'
+
+# Sem fcntl, uma trava mais antiga que isso é considerada abandonada
+TEMPO_TRAVA_ABANDONADA = 30 * 60
+INTERVALO_VERIFICACAO = 0.5
+
+class ExecucaoUnica:
+    """Agrupa chamadas simultâneas com a mesma chave em uma única execução"""
+
+    def __init__(self):
+        self._trava = threading.Lock()
+        self._em_andamento = {}
+
+    def executar(self, chave, funcao, *args, **kwargs):
+        """Executa ``funcao`` ou espera a execução em andamento da mesma ``chave``
+
+        Retorna (resultado, compartilhado), com ``compartilhado`` True quando
+        o resultado veio da execução iniciada por outra chamada. Exceções da
+        execução são levantadas em todas as chamadas que a aguardavam.
+        """
+        with self._trava:
+            futuro = self._em_andamento.get(chave)
+            lider = futuro is None
+            if lider:
+                futuro = Future()
+                self._em_andamento[chave] = futuro
+
+        if not lider:
+            return futuro.result(), True
+
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException as erro:
+            futuro.set_exception(erro)
+            raise
+        else:
+            futuro.set_result(resultado)
+            return resultado, False
+        finally:
+            with self._trava:
+                del self._em_andamento[chave]
+
+class TravaArquivo:
+    """Trava exclusiva entre processos sobre um arquivo
+
+    Usa ``flock`` quando disponível, liberada pelo sistema se o processo
+    morrer; sem ele, cria o arquivo com ``O_EXCL`` e trata como abandonada
+    uma trava mais antiga que ``TEMPO_TRAVA_ABANDONADA``.
+    """
+
+    def __init__(self, caminho=ARQUIVO_TRAVA):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self.caminho = caminho
+        self._descritor = None
+
+    def adquirir(self, bloquear=True):
+        """Adquire a trava; sem ``bloquear``, retorna False se ela estiver ocupada"""
+        if fcntl is not None:
+            descritor = os.open(self.caminho, os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(descritor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                if not bloquear:
+                    os.close(descritor)
+                    return False
+                fcntl.flock(descritor, fcntl.LOCK_EX)
+            os.ftruncate(descritor, 0)
+            os.write(descritor, f"{os.getpid()}\n".encode('ascii'))
+            self._descritor = descritor
+            return True
+
+        while True:
+            try:
+                descritor = os.open(self.caminho, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                if self._abandonada():
+                    try:
+                        os.unlink(self.caminho)
+                    except FileNotFoundError:
+                        pass
+                    continue
+                if not bloquear:
+                    return False
+                time.sleep(INTERVALO_VERIFICACAO)
+                continue
+            os.write(descritor, f"{os.getpid()}\n".encode('ascii'))
+            self._descritor = descritor
+            return True
+
+    def _abandonada(self):
+        try:
+            return time.time() - os.path.getmtime(self.caminho) > TEMPO_TRAVA_ABANDONADA
+        except OSError:
+            return False
+
+    def liberar(self):
+        if self._descritor is None:
+            return
+        if fcntl is not None:
+            fcntl.flock(self._descritor, fcntl.LOCK_UN)
+            os.close(self._descritor)
+        else:
+            os.close(self._descritor)
+            try:
+                os.unlink(self.caminho)
+            except FileNotFoundError:
+                pass
+        self._descritor = None
+
+    def esperar(self):
+        """Bloqueia até o dono atual da trava terminar"""
+        self.adquirir()
+        self.liberar()
+
+    def __enter__(self):
+        self.adquirir()
+        return self
+
+    def __exit__(self, *erro):
+        self.liberar()
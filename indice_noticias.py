@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Índice persistente das notícias já vistas pelo scraper
+Permite que cada coleta grave apenas notícias novas ou alteradas
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+ARQUIVO_INDICE = 'cache/indice_noticias.sqlite3'
+
+# Quantas notícias recentes do índice entram na montagem do feed
+LIMITE_FEED_INDICE = 50
+
+# Campos que mudam a cada coleta e não indicam alteração da notícia
+CAMPOS_VOLATEIS = ('coletadoEm',)
+
+# Parâmetros de rastreamento removidos na normalização dos links
+PARAMETROS_RASTREAMENTO = ('fbclid', 'gclid', 'ocid', 'cvid')
+
+def normalizar_link(link):
+    """Normaliza um link para servir de chave no índice"""
+    partes = urlsplit(link.strip())
+    consulta = [
+        (chave, valor) for chave, valor in parse_qsl(partes.query, keep_blank_values=True)
+        if not chave.startswith('utm_') and chave not in PARAMETROS_RASTREAMENTO
+    ]
+    caminho = partes.path.rstrip('/') or '/'
+    return urlunsplit((
+        partes.scheme.lower(),
+        partes.netloc.lower(),
+        caminho,
+        urlencode(sorted(consulta)),
+        ''
+    ))
+
+def assinatura_noticia(noticia):
+    """Hash do conteúdo da notícia, ignorando os campos voláteis"""
+    conteudo = {k: v for k, v in noticia.items() if k not in CAMPOS_VOLATEIS}
+    serializado = json.dumps(conteudo, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(serializado.encode('utf-8')).hexdigest()
+
+class IndiceNoticias:
+    """Índice SQLite das notícias vistas, com chave no link normalizado"""
+
+    def __init__(self, caminho=ARQUIVO_INDICE):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self.caminho = caminho
+        self.conexao = sqlite3.connect(caminho)
+        self.conexao.execute('''
+            CREATE TABLE IF NOT EXISTS noticias (
+                chave TEXT PRIMARY KEY,
+                assinatura TEXT NOT NULL,
+                fonte TEXT NOT NULL,
+                dados TEXT NOT NULL,
+                vista_em TEXT NOT NULL,
+                atualizada_em TEXT NOT NULL
+            )
+        ''')
+        self.conexao.execute(
+            'CREATE INDEX IF NOT EXISTS noticias_vista_em ON noticias (vista_em)'
+        )
+        self.conexao.commit()
+        self.novas = []
+        self.alteradas = []
+
+    @property
+    def houve_alteracoes(self):
+        """Indica se a última mescla gravou alguma notícia"""
+        return bool(self.novas or self.alteradas)
+
+    def mesclar(self, noticias):
+        """Grava no índice apenas as notícias novas ou alteradas
+
+        Retorna a tupla (novas, alteradas). Uma notícia nova mantém o
+        ``coletadoEm`` da primeira vez que foi vista.
+        """
+        agora = datetime.now().isoformat()
+        self.novas, self.alteradas = [], []
+        vistas = set()
+
+        for noticia in noticias:
+            chave = normalizar_link(noticia['link'])
+            if chave in vistas:
+                continue
+            vistas.add(chave)
+
+            assinatura = assinatura_noticia(noticia)
+            linha = self.conexao.execute(
+                'SELECT assinatura, dados FROM noticias WHERE chave = ?', (chave,)
+            ).fetchone()
+
+            if linha is None:
+                self.novas.append((chave, assinatura, noticia))
+            elif linha[0] != assinatura:
+                # Preserva a data de coleta original da notícia
+                noticia = dict(noticia, coletadoEm=json.loads(linha[1]).get('coletadoEm', noticia.get('coletadoEm')))
+                self.alteradas.append((chave, assinatura, noticia))
+
+        with self.conexao:
+            self.conexao.executemany(
+                'INSERT INTO noticias (chave, assinatura, fonte, dados, vista_em, atualizada_em) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                [(chave, assinatura, n['fonte'], json.dumps(n, ensure_ascii=False), agora, agora)
+                 for chave, assinatura, n in self.novas]
+            )
+            self.conexao.executemany(
+                'UPDATE noticias SET assinatura = ?, dados = ?, atualizada_em = ? WHERE chave = ?',
+                [(assinatura, json.dumps(n, ensure_ascii=False), agora, chave)
+                 for chave, assinatura, n in self.alteradas]
+            )
+
+        self.novas = [n for _, _, n in self.novas]
+        self.alteradas = [n for _, _, n in self.alteradas]
+        return self.novas, self.alteradas
+
+    def noticias(self, limite=LIMITE_FEED_INDICE):
+        """Retorna as notícias mais recentes do índice"""
+        linhas = self.conexao.execute(
+            'SELECT dados FROM noticias ORDER BY vista_em DESC, chave LIMIT ?', (limite,)
+        ).fetchall()
+        return [json.loads(dados) for (dados,) in linhas]
+
+    def fechar(self):
+        self.conexao.close()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Métricas por portal de cada coleta
+Tempos de primeiro byte, download, parse e extração, bytes e erros (mais
+uma sonda de DNS à parte), gravados em JSON lines e resumidos ao final da
+execução
+"""
+
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlparse
+
+ARQUIVO_METRICAS = 'cache/metricas_coleta.jsonl'
+
+INTERVALO_SONDA_DNS = 60 * 60  # segundos entre duas sondas de DNS do mesmo host
+
+_sondas_dns = {}  # host -> time.monotonic() da última sonda
+_trava_sondas = threading.Lock()
+
+def medir_dns(url):
+    """Tempo de resolução do host da URL em ms (None se falhar)
+
+    É uma consulta à parte, não a resolução feita pela conexão do cliente
+    HTTP (que pode nem acontecer, se a conexão vier do pool).
+    """
+    partes = urlparse(url)
+    porta = partes.port or (443 if partes.scheme == 'https' else 80)
+    inicio = time.perf_counter()
+    try:
+        socket.getaddrinfo(partes.hostname, porta, proto=socket.IPPROTO_TCP)
+    except (OSError, UnicodeError):
+        return None
+    return round((time.perf_counter() - inicio) * 1000, 2)
+
+def sondar_dns(url):
+    """``medir_dns`` no máximo uma vez por host a cada ``INTERVALO_SONDA_DNS``; None nas demais"""
+    host = urlparse(url).hostname
+    agora = time.monotonic()
+    with _trava_sondas:
+        ultima = _sondas_dns.get(host)
+        if ultima is not None and agora - ultima < INTERVALO_SONDA_DNS:
+            return None
+        _sondas_dns[host] = agora
+    return medir_dns(url)
+
+def ms_desde(inicio):
+    return round((time.perf_counter() - inicio) * 1000, 2)
+
+class RegistroMetricas:
+    """Acumula as métricas de cada portal em uma coleta
+
+    Cada métrica é um dict preenchido pelas etapas da coleta:
+    ``ttfbMs`` (envio até os cabeçalhos, incluindo DNS, conexão e TLS
+    quando a conexão não vem do pool), ``downloadMs``, ``bytes``,
+    ``parseMs``, ``extracaoMs``, ``containers``, ``itens`` e ``erro``, além
+    da espera imposta pelo agendador (``esperaMs``) e de ``tentativas``.
+    ``sondaDnsMs`` é uma resolução do host feita à parte por ``sondar_dns``,
+    antes do início da medição e só de vez em quando; None nas demais.
+    """
+
+    def __init__(self, caminho=ARQUIVO_METRICAS, sondar=True):
+        self.caminho = caminho
+        self.sondar = sondar
+        self.execucao = datetime.now().isoformat()
+        self.registros = []
+        self._trava = threading.Lock()
+
+    def iniciar(self, portal):
+        sonda = sondar_dns(portal['busca']) if self.sondar else None
+        return {
+            "execucao": self.execucao,
+            "portal": portal['nome'],
+            "host": urlparse(portal['busca']).netloc,
+            "status": None,
+            "tentativas": 1,
+            "esperaMs": None,
+            "sondaDnsMs": sonda,
+            "ttfbMs": None,
+            "downloadMs": None,
+            "bytes": 0,
+            "parseMs": None,
+            "extracaoMs": None,
+            "containers": 0,
+            "itens": 0,
+            "erro": None,
+            "_inicio": time.perf_counter(),
+        }
+
+    def concluir(self, metrica, noticias):
+        metrica['itens'] = len(noticias)
+        metrica['totalMs'] = ms_desde(metrica.pop('_inicio'))
+        with self._trava:
+            self.registros.append(metrica)
+
+    def salvar(self):
+        """Acrescenta as métricas desta execução ao arquivo JSON lines"""
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        with self._trava:
+            linhas = ''.join(json.dumps(m, ensure_ascii=False) + '\n' for m in self.registros)
+        with open(self.caminho, 'a', encoding='utf-8') as f:
+            f.write(linhas)
+
+    def resumo(self):
+        """Imprime uma tabela por portal, do mais lento para o mais rápido"""
+        with self._trava:
+            registros = sorted(self.registros, key=lambda m: m.get('totalMs') or 0, reverse=True)
+        if not registros:
+            return
+
+        def fmt(valor):
+            return '-' if valor is None else f"{valor:.0f}"
+
+        print("\n⏱️  Métricas por portal (ms):")
+        print(f"   {'portal':<28} {'total':>6} {'espera':>6} {'dns*':>5} {'ttfb':>6} {'down':>6} "
+              f"{'parse':>6} {'extr':>5} {'KB':>6} {'cont':>4} {'itens':>5} {'tent':>4}  erro")
+        for m in registros:
+            print(f"   {m['portal'][:28]:<28} {fmt(m.get('totalMs')):>6} {fmt(m.get('esperaMs')):>6} "
+                  f"{fmt(m.get('sondaDnsMs')):>5} {fmt(m['ttfbMs']):>6} {fmt(m['downloadMs']):>6} "
+                  f"{fmt(m['parseMs']):>6} {fmt(m['extracaoMs']):>5} {m['bytes'] / 1024:6.0f} "
+                  f"{m['containers']:>4} {m['itens']:>5} {m['tentativas']:>4}  {m['erro'] or ''}")
+
+        total_bytes = sum(m['bytes'] for m in registros)
+        print(f"   Mais lento: {registros[0]['portal']} | {total_bytes / 1024:.0f} KB baixados "
+              f"| métricas em {self.caminho}")
+        print("   dns*: sonda à parte, uma vez por host a cada hora; não entra nos demais tempos")
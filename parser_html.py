@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Backends de parsing HTML do scraper
+Usa selectolax ou lxml quando instalados e cai para html.parser caso contrário
+"""
+
+import html
+import os
+import re
+from functools import lru_cache
+
+import soupsieve
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.dammit import UnicodeDammit
+
+try:
+    from selectolax.lexbor import LexborHTMLParser as _ParserSelectolax
+except ImportError:
+    try:
+        from selectolax.parser import HTMLParser as _ParserSelectolax
+    except ImportError:
+        _ParserSelectolax = None
+
+try:
+    import lxml  # noqa: F401
+    LXML_DISPONIVEL = True
+except ImportError:
+    LXML_DISPONIVEL = False
+
+# Ordem de preferência quando nenhum backend é pedido explicitamente
+BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+# Tokenizador usado no recorte de documentos (parse parcial)
+_RE_MARCACAO = re.compile(
+    r'<(?:!--.*?-->|!\[CDATA\[.*?\]\]>|[!?][^>]*>|'
+    r'(/?)([a-zA-Z][^\s/>]*)((?:[^>"\']|"[^"]*"|\'[^\']*\')*)>)',
+    re.S
+)
+_RE_ATRIBUTO = re.compile(r'([^\s=/>"\']+)(?:\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+)))?')
+_RE_FIM_TEXTO_BRUTO = {
+    'script': re.compile(r'</script\s*>', re.I),
+    'style': re.compile(r'</style\s*>', re.I),
+}
+_ELEMENTOS_VAZIOS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr'
+))
+
+# Nós de texto do BeautifulSoup que contam como texto visível (não comentários, CDATA etc.)
+_TEXTOS_VISIVEIS = (NavigableString,)
+
+# Seletores compostos sem combinadores: tag, .classe, #id e [atributo]
+_RE_COMPOSTO = re.compile(
+    r'([a-zA-Z][\w-]*|\*)?((?:\.[\w-]+|#[\w-]+|'
+    r'\[\s*[\w:-]+\s*(?:[*^$~|]?=\s*(?:"[^"]*"|\'[^\']*\'|[^\]\s]+)\s*)?\])*)'
+)
+_RE_PARTE = re.compile(
+    r'\.([\w-]+)|#([\w-]+)|'
+    r'\[\s*([\w:-]+)\s*(?:([*^$~|]?=)\s*(?:"([^"]*)"|\'([^\']*)\'|([^\]\s]+))\s*)?\]'
+)
+
+class NoSelectolax:
+    """Adapta um nó do selectolax à parte da API do BeautifulSoup usada no projeto"""
+
+    __slots__ = ('_no',)
+
+    def __init__(self, no):
+        self._no = no
+
+    @property
+    def name(self):
+        return self._no.tag
+
+    def select(self, seletor):
+        # O selectolax inclui o próprio nó no resultado, e repete o elemento que
+        # casa com mais de uma parte de 'a, b'; o soupsieve não faz nenhum dos dois
+        vistos = {self._no.mem_id}
+        resultado = []
+        for no in self._no.css(texto_seletor(seletor)):
+            if no.mem_id not in vistos:
+                vistos.add(no.mem_id)
+                resultado.append(NoSelectolax(no))
+        return resultado
+
+    def select_one(self, seletor):
+        for no in self._no.css(texto_seletor(seletor)):
+            if no.mem_id != self._no.mem_id:
+                return NoSelectolax(no)
+        return None
+
+    def get_text(self):
+        return self._no.text(deep=True)
+
+    def get(self, atributo, padrao=None):
+        valor = self._no.attributes.get(atributo)
+        return padrao if valor is None else valor
+
+    def find_parent(self, nome):
+        pai = self._no.parent
+        while pai is not None:
+            if pai.tag == nome:
+                return NoSelectolax(pai)
+            pai = pai.parent
+        return None
+
+def texto_seletor(seletor):
+    """Retorna o CSS original de um seletor, compilado ou não"""
+    return getattr(seletor, 'pattern', seletor)
+
+@lru_cache(maxsize=None)
+def _compilar_plano(itens):
+    return {campo: soupsieve.compile(seletor) for campo, seletor in itens if seletor}
+
+def plano_seletores(portal):
+    """Retorna os seletores do portal compilados pelo soupsieve
+
+    Os objetos compilados podem ser passados direto para select/select_one
+    (tanto do BeautifulSoup quanto de NoSelectolax) e ficam em cache pelo
+    conteúdo dos seletores, então cada portal é compilado uma única vez.
+    """
+    return _compilar_plano(tuple(portal['selectors'].items()))
+
+def backends_disponiveis():
+    """Lista os backends instalados, na ordem de preferência"""
+    disponiveis = []
+    if _ParserSelectolax is not None:
+        disponiveis.append('selectolax')
+    if LXML_DISPONIVEL:
+        disponiveis.append('lxml')
+    disponiveis.append('html.parser')
+    return disponiveis
+
+def resolver_backend(backend=None):
+    """Escolhe o backend pedido (ou o de SCRAPER_PARSER) se estiver instalado"""
+    backend = backend or os.environ.get('SCRAPER_PARSER')
+    disponiveis = backends_disponiveis()
+
+    if backend is None:
+        return disponiveis[0]
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend de parsing desconhecido: {backend}")
+    if backend not in disponiveis:
+        return 'html.parser'
+    return backend
+
+def decodificar_html(conteudo):
+    """Converte bytes em texto com a mesma detecção de encoding do BeautifulSoup"""
+    if isinstance(conteudo, str):
+        return conteudo
+    return UnicodeDammit(conteudo, is_html=True).unicode_markup
+
+@lru_cache(maxsize=256)
+def compilar_seletor_simples(seletor):
+    """Compila uma lista de seletores compostos simples
+
+    Retorna uma tupla de (tag, classes, id, atributos) por seletor, ou None
+    quando algum deles usa combinadores ou pseudo-classes.
+    """
+    compostos = []
+    for parte in seletor.split(','):
+        parte = parte.strip()
+        encontrado = _RE_COMPOSTO.fullmatch(parte)
+        if not parte or not encontrado:
+            return None
+
+        tag = encontrado.group(1)
+        tag = None if tag in (None, '*') else tag.lower()
+        classes, id_elemento, atributos = [], None, []
+
+        for item in _RE_PARTE.finditer(encontrado.group(2)):
+            classe, id_item, nome, operador = item.group(1, 2, 3, 4)
+            if classe:
+                classes.append(classe)
+            elif id_item:
+                id_elemento = id_item
+            else:
+                valor = next((v for v in item.group(5, 6, 7) if v is not None), None)
+                atributos.append((nome.lower(), operador, valor))
+
+        compostos.append((tag, tuple(classes), id_elemento, tuple(atributos)))
+
+    return tuple(compostos)
+
+def _ler_atributos(bruto):
+    atributos = {}
+    for item in _RE_ATRIBUTO.finditer(bruto):
+        nome = item.group(1).lower()
+        if nome in atributos:
+            continue
+        valor = next((v for v in item.group(2, 3, 4) if v is not None), '')
+        atributos[nome] = html.unescape(valor)
+    if 'class' in atributos:
+        # Mesma normalização do BeautifulSoup, que separa as classes por espaço
+        atributos['class'] = ' '.join(atributos['class'].split())
+    return atributos
+
+def _atributo_confere(valor, operador, esperado):
+    if valor is None:
+        return False
+    if operador is None:
+        return True
+    if operador == '=':
+        return valor == esperado
+    if operador == '~=':
+        return esperado in valor.split()
+    if operador == '|=':
+        return valor == esperado or valor.startswith(esperado + '-')
+    if not esperado:
+        return False
+    if operador == '*=':
+        return esperado in valor
+    if operador == '^=':
+        return valor.startswith(esperado)
+    return valor.endswith(esperado)
+
+def _tag_confere(compostos, tag, bruto):
+    atributos = None
+    for tag_esperada, classes, id_elemento, condicoes in compostos:
+        if tag_esperada is not None and tag_esperada != tag:
+            continue
+        # Filtro barato antes de interpretar os atributos da tag
+        if any(classe not in bruto for classe in classes):
+            continue
+        if atributos is None:
+            atributos = _ler_atributos(bruto)
+        if classes and not set(classes) <= set(atributos.get('class', '').split()):
+            continue
+        if id_elemento is not None and atributos.get('id') != id_elemento:
+            continue
+        if all(_atributo_confere(atributos.get(nome), operador, esperado)
+               for nome, operador, esperado in condicoes):
+            return True
+    return False
+
+def recortar_documento(texto, seletor, limite):
+    """Retorna o trecho inicial do HTML que contém os primeiros ``limite`` containers
+
+    O documento é percorrido por um tokenizador leve, sem montar árvore, até
+    que os ``limite`` primeiros elementos que casam com ``seletor`` tenham sido
+    fechados. Retorna None se o seletor não for simples o bastante ou se o
+    documento não tiver containers suficientes (nesses casos o parse precisa
+    ser completo).
+    """
+    compostos = compilar_seletor_simples(seletor)
+    if not compostos or limite <= 0:
+        return None
+
+    pilha = []  # (tag, é um dos primeiros containers)
+    encontrados = 0
+    abertos = 0
+    posicao = 0
+
+    while True:
+        marcacao = _RE_MARCACAO.search(texto, posicao)
+        if marcacao is None:
+            return None
+        posicao = marcacao.end()
+
+        nome = marcacao.group(2)
+        if nome is None:
+            continue  # comentário, doctype, CDATA
+        tag = nome.lower()
+        bruto = marcacao.group(3)
+
+        if marcacao.group(1):
+            # Tag de fechamento: fecha até a última tag aberta com o mesmo nome
+            for indice in range(len(pilha) - 1, -1, -1):
+                if pilha[indice][0] == tag:
+                    abertos -= sum(1 for _, container in pilha[indice:] if container)
+                    del pilha[indice:]
+                    break
+            if encontrados == limite and abertos == 0:
+                return texto[:posicao]
+            continue
+
+        container = encontrados < limite and _tag_confere(compostos, tag, bruto)
+        if container:
+            encontrados += 1
+
+        if tag in _RE_FIM_TEXTO_BRUTO:
+            # Conteúdo de script/style não é HTML: pula direto para o fechamento
+            fim = _RE_FIM_TEXTO_BRUTO[tag].search(texto, posicao)
+            if fim is None:
+                return None
+            posicao = fim.end()
+        elif tag not in _ELEMENTOS_VAZIOS and not bruto.rstrip().endswith('/'):
+            pilha.append((tag, container))
+            if container:
+                abertos += 1
+            continue
+
+        # Elemento que já termina aqui
+        if container and encontrados == limite and abertos == 0:
+            return texto[:posicao]
+
+def criar_documento(conteudo, backend=None):
+    """Faz o parse do HTML e devolve um objeto com select/select_one/get_text/get"""
+    backend = resolver_backend(backend)
+
+    if backend == 'selectolax':
+        arvore = _ParserSelectolax(decodificar_html(conteudo))
+        return NoSelectolax(arvore.root)
+
+    return BeautifulSoup(conteudo, backend)
+
+def selecionar_containers(conteudo, seletor, limite, backend=None, parcial=True):
+    """Seleciona os primeiros ``limite`` containers, fazendo parse parcial se possível
+
+    Retorna o documento usado e a lista de containers. Se o trecho recortado
+    não produzir os containers esperados, o documento inteiro é processado.
+    O selectolax monta a árvore mais rápido do que o recorte leva para
+    percorrer o HTML, então nele o parse é sempre completo.
+    """
+    backend = resolver_backend(backend)
+    if parcial and backend != 'selectolax':
+        texto = decodificar_html(conteudo)
+        trecho = recortar_documento(texto, texto_seletor(seletor), limite)
+        if trecho is not None:
+            documento = criar_documento(trecho, backend)
+            containers = documento.select(seletor)[:limite]
+            if len(containers) == limite:
+                return documento, containers
+
+    documento = criar_documento(conteudo, backend)
+    return documento, documento.select(seletor)[:limite]
+
+def percorrer_elementos(documento):
+    """Percorre uma única vez os elementos abaixo do documento, em pré-ordem
+
+    Gera tuplas (nó, tag, classe, profundidade, texto), em que ``nó`` tem a
+    mesma API dos nós de ``criar_documento``, ``classe`` é o atributo class
+    (string, '' se ausente) e ``texto`` é o tamanho do texto direto do
+    elemento, sem espaços nas pontas e ignorando script e style. O próprio
+    documento não é incluído, como em ``documento.select``.
+    """
+    if isinstance(documento, NoSelectolax):
+        # traverse() percorre a árvore em C; a profundidade vem da do pai
+        raiz = documento._no
+        profundidades = {raiz.mem_id: 0}
+        for no in raiz.traverse(include_text=False):
+            tag = no.tag
+            if tag.startswith('-') or tag.startswith('_') or no.mem_id == raiz.mem_id:
+                continue
+            profundidade = profundidades.get(no.parent.mem_id, 0) + 1
+            profundidades[no.mem_id] = profundidade
+            texto = 0 if tag in _RE_FIM_TEXTO_BRUTO else len(no.text(deep=False, strip=True))
+            yield NoSelectolax(no), tag, no.attributes.get('class') or '', profundidade, texto
+        return
+
+    pilha = [(filho, 1) for filho in reversed(documento.contents)]
+    while pilha:
+        no, profundidade = pilha.pop()
+        if not isinstance(no, Tag):
+            continue
+        classe = no.get('class')
+        if isinstance(classe, list):
+            classe = ' '.join(classe)
+        texto = 0
+        if no.name not in _RE_FIM_TEXTO_BRUTO:
+            texto = sum(len(filho.strip()) for filho in no.contents
+                        if type(filho) in _TEXTOS_VISIVEIS)
+        yield no, no.name, classe or '', profundidade, texto
+        pilha.extend((filho, profundidade + 1) for filho in reversed(no.contents))
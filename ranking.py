@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Seleção determinística das notícias do feed
+Combina relevância regional e recência, limita quantas notícias cada fonte
+ocupa e escolhe as melhores com um heap; entradas iguais geram sempre o
+mesmo feed, na mesma ordem
+"""
+
+import heapq
+from datetime import datetime, timedelta
+
+from indice_noticias import normalizar_link
+
+LIMITE_FEED = 15
+COTA_POR_FONTE = 4  # máximo de notícias de uma mesma fonte, se houver alternativas
+
+IDADE_MAXIMA_DIAS = 30  # notícias mais antigas que isso (em relação à mais nova) ficam de fora
+
+PESO_RECENCIA = 4.0  # pontos da notícia mais nova da entrada
+MEIA_VIDA_HORAS = 24.0  # a cada meia-vida o bônus de recência cai pela metade
+
+def momento_noticia(noticia, campos=('dataISO', 'coletadoEm')):
+    """Data de publicação da notícia (``dataISO``) ou, sem ela, a de coleta
+
+    Retorna um datetime no horário local, sem fuso, para que as duas
+    origens possam ser comparadas; None se nenhuma for válida. Com
+    ``campos=('dataISO',)``, só a data de publicação.
+    """
+    for campo in campos:
+        try:
+            momento = datetime.fromisoformat(noticia.get(campo) or '')
+        except ValueError:
+            continue
+        if momento.tzinfo is not None:
+            momento = momento.astimezone().replace(tzinfo=None)
+        return momento
+    return None
+
+def bonus_recencia(momento, referencia):
+    """Pontos de recência de ``momento``: ``PESO_RECENCIA`` na referência, metade a cada meia-vida"""
+    if momento is None or referencia is None:
+        return 0.0
+    idade = max(0.0, (referencia - momento).total_seconds() / 3600)
+    return PESO_RECENCIA * 0.5 ** (idade / MEIA_VIDA_HORAS)
+
+def pontuacao(noticia, referencia, so_publicacao=False):
+    """Relevância mais um bônus de recência relativo a ``referencia``
+
+    ``referencia`` é o momento da notícia mais nova da entrada, e não o
+    relógio, para que a mesma entrada sempre gere a mesma pontuação. Com
+    ``so_publicacao``, notícias sem data de publicação ficam sem bônus: a
+    data de coleta de um link novo é sempre recente e as poria à frente
+    das notícias datadas.
+    """
+    momento = momento_noticia(noticia, ('dataISO',) if so_publicacao else ('dataISO', 'coletadoEm'))
+    return noticia.get('relevancia', 0) + bonus_recencia(momento, referencia)
+
+def chave_ordenacao(noticia, referencia, so_publicacao=False):
+    """Maior pontuação primeiro; empates resolvidos pelo link e pelo título"""
+    return (-round(pontuacao(noticia, referencia, so_publicacao), 6), normalizar_link(noticia['link']), noticia.get('titulo', ''))
+
+def selecionar_feed(noticias, limite=LIMITE_FEED, cota_por_fonte=COTA_POR_FONTE, idade_maxima_dias=IDADE_MAXIMA_DIAS):
+    """Escolhe até ``limite`` notícias, respeitando a cota por fonte
+
+    Descarta as notícias fora da janela de ``idade_maxima_dias``, retira do
+    heap em ordem de pontuação e pula notícias de fontes que já atingiram
+    a cota; se faltarem notícias para completar o feed, as puladas entram
+    depois, na mesma ordem. Se alguma notícia tiver data de publicação, a
+    recência é medida só por ela e as sem data ficam sem bônus; senão,
+    vale a data de coleta.
+    """
+    publicadas = [m for m in (momento_noticia(n, ('dataISO',)) for n in noticias) if m is not None]
+    momentos = publicadas or [m for m in map(momento_noticia, noticias) if m is not None]
+    referencia = max(momentos) if momentos else None
+    so_publicacao = bool(publicadas)
+
+    if referencia is not None and idade_maxima_dias is not None:
+        limite_idade = referencia - timedelta(days=idade_maxima_dias)
+        noticias = [n for n in noticias if (momento_noticia(n) or referencia) >= limite_idade]
+
+    heap = [(chave_ordenacao(n, referencia, so_publicacao), i) for i, n in enumerate(noticias)]
+    heapq.heapify(heap)
+
+    selecionadas, excedentes = [], []
+    por_fonte = {}
+    while heap and len(selecionadas) < limite:
+        _, indice = heapq.heappop(heap)
+        noticia = noticias[indice]
+        fonte = noticia.get('fonte')
+        if por_fonte.get(fonte, 0) >= cota_por_fonte:
+            excedentes.append(noticia)
+            continue
+        por_fonte[fonte] = por_fonte.get(fonte, 0) + 1
+        selecionadas.append(noticia)
+
+    return selecionadas + excedentes[:limite - len(selecionadas)]
+
+def preservar_coleta(noticias, anteriores, vistas=None, momento=None):
+    """Dá a cada notícia um ``coletadoEm`` estável: a primeira vez que o link foi coletado
+
+    ``vistas`` (link normalizado -> data ISO) guarda essa data entre
+    coletas e recebe os links novos; as datas do feed ``anteriores`` também
+    entram nele. Um link nunca visto recebe ``momento``, o início da coleta,
+    igual para todos os links novos. Sem isso, cada coleta daria uma nova
+    data às notícias ainda não publicadas, que passariam à frente das
+    publicadas, e o feed nunca seria idêntico ao anterior.
+    """
+    vistas = {} if vistas is None else vistas
+    for noticia in anteriores or []:
+        if noticia.get('link') and noticia.get('coletadoEm'):
+            vistas.setdefault(normalizar_link(noticia['link']), noticia['coletadoEm'])
+
+    preservadas = []
+    for noticia in noticias:
+        chave = normalizar_link(noticia['link'])
+        data = vistas.get(chave) or momento
+        if data is None:
+            preservadas.append(noticia)
+            continue
+        vistas[chave] = data
+        preservadas.append(noticia if noticia.get('coletadoEm') == data else dict(noticia, coletadoEm=data))
+    return preservadas
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pontuação de relevância regional das notícias
+Um único regex compilado sobre um gazetteer de termos da região (sem
+acentos, com pesos) pontua título e resumo de cada notícia
+"""
+
+import re
+from functools import lru_cache
+
+from deduplicacao import remover_acentos
+
+# Termos da região e seus pesos; escritos sem acentos e em minúsculas.
+# Os termos só casam com palavras inteiras, então os gentílicos
+# ("paranaense", "maringaense") precisam estar na lista
+TERMOS_REGIONAIS = {
+    'paranavai': 5,
+    'paranavaiense': 5,
+    'leonidas': 4,
+    'noroeste do parana': 4,
+    'noroeste paranaense': 4,
+    'noroeste': 2,
+    'amusep': 3,
+    'amunpar': 3,
+    'alto parana': 3,
+    'nova esperanca': 3,
+    'nova londrina': 3,
+    'terra rica': 3,
+    'loanda': 3,
+    'tamboara': 3,
+    'santa isabel do ivai': 3,
+    'cianorte': 2,
+    'cianortense': 2,
+    'umuarama': 2,
+    'umuaramense': 2,
+    'maringa': 2,
+    'maringaense': 2,
+    'londrina': 1,
+    'londrinense': 1,
+    'parana': 1,
+    'paranaense': 1,
+    'curitiba': 1,
+    'curitibano': 1,
+    'curitibana': 1,
+}
+
+_TERMOS_PADRAO = tuple(sorted(TERMOS_REGIONAIS.items()))
+
+PESO_TITULO = 2  # um termo no título vale mais do que no resumo
+
+# Pontuação mínima para manter a notícia (portal['relevanciaMinima'])
+RELEVANCIA_MINIMA = 0
+
+@lru_cache(maxsize=32)
+def compilar_termos(termos):
+    """Regex com todos os termos e o dicionário de pesos
+
+    Os termos mais longos vêm primeiro na alternância, para que
+    'alto parana' não seja contado também como 'parana'.
+    """
+    ordenados = sorted((termo for termo, _ in termos), key=len, reverse=True)
+    regex = re.compile(r'\b(?:' + '|'.join(re.escape(t) for t in ordenados) + r')\b')
+    return regex, dict(termos)
+
+def termos_portal(portal):
+    """Gazetteer do portal: o regional mais os termos extras de portal['termos']"""
+    termos = dict(TERMOS_REGIONAIS)
+    for termo, peso in (portal.get('termos') or {}).items():
+        termos[remover_acentos(termo)] = peso
+    return tuple(sorted(termos.items()))
+
+def pontuar(texto, termos):
+    """Soma dos pesos dos termos distintos encontrados no texto"""
+    if not texto:
+        return 0
+    regex, pesos = compilar_termos(termos)
+    return sum(pesos[termo] for termo in set(regex.findall(remover_acentos(texto))))
+
+def pontuar_noticia(noticia, termos=None):
+    termos = termos or _TERMOS_PADRAO
+    return PESO_TITULO * pontuar(noticia.get('titulo'), termos) + pontuar(noticia.get('resumo'), termos)
+
+def aplicar_relevancia(portal, noticias):
+    """Preenche ``relevancia`` em cada notícia e descarta as abaixo do mínimo do portal"""
+    termos = termos_portal(portal)
+    minimo = portal.get('relevanciaMinima', RELEVANCIA_MINIMA)
+    relevantes = []
+    for noticia in noticias:
+        noticia['relevancia'] = pontuar_noticia(noticia, termos)
+        if noticia['relevancia'] >= minimo:
+            relevantes.append(noticia)
+    return relevantes
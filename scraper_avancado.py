@@ -5,13 +5,54 @@ Web Scraper Avançado para Portal Paranavaí News
 Coleta notícias de portais parceiros da região
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
+import multiprocessing
 import time
-from datetime import datetime
+from datetime import datetime, timedelta
+import hashlib
 import os
 import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from agendador_hosts import AgendadorHosts
+import cliente_http
+from cliente_http import cabecalhos_portal, obter_sessao
+from datas import normalizar_data
+from deduplicacao import remover_duplicatas
+from execucao_unica import ExecucaoUnica, TravaArquivo
+from indice_noticias import IndiceNoticias, assinatura_noticia
+from metricas import RegistroMetricas, ms_desde
+from parser_html import plano_seletores, selecionar_containers
+from ranking import IDADE_MAXIMA_DIAS, preservar_coleta, selecionar_feed
+from relevancia import aplicar_relevancia
+
+# Coleta concorrente: limite global de conexões (o intervalo entre
+# requisições ao mesmo host é ajustado pelo AgendadorHosts)
+MAX_CONEXOES_SIMULTANEAS = 4
+
+# Máximo de notícias por portal (sobrescrito por portal['limite']); o parse
+# do HTML termina assim que esse número de containers foi lido
+MAX_NOTICIAS_POR_PORTAL = 5
+
+# Feed publicado
+ARQUIVO_FEED = 'cache/noticias_parceiros.json'
+
+# Validadores HTTP das páginas de busca, ao lado do feed
+ARQUIVO_VALIDADORES = 'cache/validadores_http.json'
+
+# Quando cada link foi coletado pela primeira vez (dá o coletadoEm estável)
+ARQUIVO_PRIMEIRA_COLETA = 'cache/primeira_coleta.json'
+
+# Modo contínuo: intervalo padrão entre consultas a cada portal (o mesmo
+# do cliente JavaScript); sobrescrito por portal['intervalo']
+INTERVALO_ATUALIZACAO = 15 * 60
+
+# Saída alternativa em NDJSON: acompanhada portal a portal durante a coleta
+# (no arquivo .parcial) e publicada com o feed selecionado e um manifesto
+ARQUIVO_NDJSON = 'cache/noticias_parceiros.ndjson'
+ARQUIVO_MANIFESTO = 'cache/noticias_parceiros.manifest.json'
 
 # Lista de portais parceiros da região
 PORTAIS_PARCEIROS = [
@@ -104,7 +145,14 @@ PORTAIS_PARCEIROS = [
             "imagem": ".newsimg img, .img img, .media img",
             "data": ".source .timestamp, .published, time"
         },
-        "tipo": "bing_news"
+        "tipo": "bing_news",
+        "relevanciaMinima": 1,  # resultados de busca sem nenhum termo da região são descartados
+        "headers": {
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+            "Accept-Language": "pt-BR,pt;q=0.9,en;q=0.8",
+            "Accept-Encoding": "gzip, deflate, br",
+            "Referer": "https://www.bing.com/"
+        }
     },
     {
         "nome": "Portal Tri Notícias",
@@ -123,17 +171,210 @@ PORTAIS_PARCEIROS = [
     }
 ]
 
-def criar_sessao():
-    """Cria uma sessão HTTP com headers apropriados"""
-    sessao = requests.Session()
-    sessao.headers.update({
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-        'Accept-Language': 'pt-BR,pt;q=0.8,en;q=0.5,en-US;q=0.3',
-        'Accept-Encoding': 'gzip, deflate',
-        'Connection': 'keep-alive',
-    })
-    return sessao
+# Compila os seletores de cada portal uma única vez, no carregamento do módulo
+for _portal in PORTAIS_PARCEIROS:
+    plano_seletores(_portal)
+
+def criar_sessao(**opcoes):
+    """Cria uma sessão HTTP com headers apropriados (veja cliente_http.criar_sessao)"""
+    return cliente_http.criar_sessao(**opcoes)
+
+def escrever_atomico(caminho, conteudo):
+    """Grava um arquivo de forma atômica: temporário + fsync + rename
+
+    Quem lê o caminho vê sempre a versão anterior completa ou a nova
+    completa, nunca um arquivo pela metade, e sem precisar de trava.
+    """
+    diretorio = os.path.dirname(caminho) or '.'
+    os.makedirs(diretorio, exist_ok=True)
+    
+    descritor, temporario = tempfile.mkstemp(
+        dir=diretorio, prefix=f".{os.path.basename(caminho)}.", suffix='.tmp'
+    )
+    try:
+        with os.fdopen(descritor, 'w', encoding='utf-8') as f:
+            f.write(conteudo)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temporario, 0o644)  # mkstemp cria com 0600
+        os.replace(temporario, caminho)
+    except BaseException:
+        try:
+            os.unlink(temporario)
+        except OSError:
+            pass
+        raise
+    
+    sincronizar_diretorio(diretorio)
+
+def sincronizar_diretorio(diretorio):
+    """Persiste a entrada do diretório após um rename (apenas em POSIX)"""
+    if os.name != 'posix':
+        return
+    descritor = os.open(diretorio, os.O_RDONLY)
+    try:
+        os.fsync(descritor)
+    finally:
+        os.close(descritor)
+
+def versao_feed(noticias):
+    """Identificador do conteúdo do feed, gravado em todos os artefatos da coleta
+
+    Leitores comparam a versão do JSON com a do HTML para saber se têm
+    um par consistente.
+    """
+    serializado = json.dumps(noticias, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(serializado.encode('utf-8')).hexdigest()[:16]
+
+class CacheValidadores:
+    """Cache persistente de validadores HTTP (ETag / Last-Modified) por URL de busca
+
+    Guarda junto aos validadores as notícias extraídas da última resposta
+    completa, para que um 304 reaproveite o resultado sem novo parse.
+    """
+
+    def __init__(self, caminho=ARQUIVO_VALIDADORES):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+        self._entradas = self._carregar()
+
+    def _carregar(self):
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def cabecalhos(self, url):
+        """Retorna os cabeçalhos condicionais conhecidos para a URL"""
+        with self._trava:
+            entrada = self._entradas.get(url)
+        if not entrada:
+            return {}
+        
+        cabecalhos = {}
+        if entrada.get('etag'):
+            cabecalhos['If-None-Match'] = entrada['etag']
+        if entrada.get('lastModified'):
+            cabecalhos['If-Modified-Since'] = entrada['lastModified']
+        return cabecalhos
+
+    def noticias(self, url):
+        with self._trava:
+            return list(self._entradas.get(url, {}).get('noticias', []))
+
+    def registrar(self, url, response, noticias):
+        """Atualiza os validadores e notícias de uma resposta 200"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        
+        with self._trava:
+            if not etag and not last_modified:
+                # Sem validadores não há como revalidar depois
+                self._entradas.pop(url, None)
+                return
+            
+            self._entradas[url] = {
+                "etag": etag,
+                "lastModified": last_modified,
+                "noticias": noticias
+            }
+
+    def salvar(self):
+        with self._trava:
+            conteudo = json.dumps(self._entradas, ensure_ascii=False, indent=2)
+        escrever_atomico(self.caminho, conteudo)
+
+class PrimeiraColeta(dict):
+    """Data da primeira coleta de cada link normalizado, persistida em JSON
+
+    Links sem notícia há mais de duas vezes ``IDADE_MAXIMA_DIAS`` saem do
+    arquivo ao salvar; a essa altura a notícia já não entra no feed.
+    """
+
+    def __init__(self, caminho=ARQUIVO_PRIMEIRA_COLETA):
+        self.caminho = caminho
+        super().__init__(ler_json(caminho) or {})
+
+    def salvar(self):
+        limite = (datetime.now() - timedelta(days=2 * IDADE_MAXIMA_DIAS)).isoformat()
+        recentes = {link: data for link, data in self.items() if data >= limite}
+        escrever_atomico(self.caminho, json.dumps(recentes, ensure_ascii=False, indent=2, sort_keys=True))
+
+def baixar_pagina(sessao, url, timeout=15, headers=None, cache=None, metrica=None, agendador=None):
+    """Baixa uma página, enviando GET condicional quando há validadores em cache
+
+    Uma resposta 304 é devolvida sem erro; qualquer outro status de falha
+    levanta a exceção de ``raise_for_status``. Se ``metrica`` for informada,
+    registra tempo até os cabeçalhos, download, status e bytes. Com um
+    ``AgendadorHosts``, a requisição respeita o intervalo do host e falhas
+    transitórias são repetidas.
+    """
+    cabecalhos = dict(headers or {})
+    if cache is not None:
+        cabecalhos.update(cache.cabecalhos(url))
+    
+    def requisitar():
+        inicio = time.perf_counter()
+        response = sessao.get(url, headers=cabecalhos or None, timeout=timeout, stream=True)
+        if metrica is not None:
+            metrica['ttfbMs'] = ms_desde(inicio)
+            metrica['status'] = response.status_code
+        
+        inicio = time.perf_counter()
+        conteudo = response.content  # lê o corpo inteiro
+        if metrica is not None:
+            metrica['downloadMs'] = ms_desde(inicio)
+            metrica['bytes'] = len(conteudo or b'')
+        
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
+    
+    if agendador is None:
+        return requisitar()
+    return agendador.executar(url, requisitar, metrica)
+
+def reaproveitar_noticias(portal, cache):
+    """Retorna as notícias já extraídas de uma página que não mudou (304)"""
+    noticias = cache.noticias(portal['busca'])
+    print(f"   ♻️  {portal['nome']} sem alterações: {len(noticias)} notícias reaproveitadas")
+    return noticias
+
+def parsear_pagina(portal, conteudo, backend=None, parcial=True):
+    """Parse e extração de uma página já baixada
+
+    Recebe e devolve apenas objetos simples (a configuração do portal, os
+    bytes da página, dicts), para poder rodar em um ProcessPoolExecutor.
+    Retorna (notícias, métricas do parse).
+    """
+    metrica = {}
+    parsear = parsear_noticias_bing if portal.get('tipo') == 'bing_news' else parsear_noticias_portal
+    noticias = parsear(portal, conteudo, backend, parcial, metrica)
+    return noticias, metrica
+
+def criar_processos_parse(quantidade):
+    """ProcessPoolExecutor para ``parsear_pagina``, ou None se ``quantidade`` não for positiva
+
+    Os processos nascem no primeiro submit, dentro de uma thread de
+    download. Um fork nesse momento poderia herdar travas presas por
+    outras threads (a do stdout, ``datas._trava_ordem``) e travar; por
+    isso eles partem de um forkserver (ou de spawn, onde não houver).
+    """
+    if quantidade <= 0:
+        return None
+    metodo = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(quantidade, mp_context=multiprocessing.get_context(metodo))
+
+def extrair_da_pagina(portal, conteudo, metrica=None, processos=None):
+    """Extrai as notícias da página nesta thread ou em um processo de ``processos``"""
+    if processos is None:
+        noticias, tempos = parsear_pagina(portal, conteudo)
+    else:
+        noticias, tempos = processos.submit(parsear_pagina, portal, conteudo).result()
+    if metrica is not None:
+        metrica.update(tempos)
+    return noticias
 
 def limpar_texto(texto):
     """Remove caracteres especiais e limpa o texto"""
@@ -148,254 +389,431 @@ def limpar_texto(texto):
     
     return texto
 
-def extrair_noticias_bing(portal, sessao):
+def extrair_noticias_bing(portal, sessao, cache=None, metrica=None, agendador=None, processos=None):
     """Extrai notícias específicamente do Bing News"""
     try:
         print(f"🔍 Coletando de: {portal['nome']} (Bing News)")
         
-        # Headers específicos para Bing
-        headers_bing = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-            'Accept-Language': 'pt-BR,pt;q=0.9,en;q=0.8',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Referer': 'https://www.bing.com/'
-        }
-        
-        response = requests.get(portal['busca'], headers=headers_bing, timeout=20)
-        response.raise_for_status()
+        # Headers específicos para Bing vêm de portal['headers']
+        response = baixar_pagina(sessao, portal['busca'], timeout=20, headers=cabecalhos_portal(portal),
+                                 cache=cache, metrica=metrica, agendador=agendador)
+        if response.status_code == 304:
+            return reaproveitar_noticias(portal, cache)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        noticias = []
-        
-        # Seletores específicos do Bing News
-        news_cards = soup.select('.news-card, .newsitem, [aria-label*="notícia"], [data-module="NewsArticle"]')[:5]
-        
-        if not news_cards:
-            # Fallback para outros seletores do Bing
-            news_cards = soup.select('article, .b_algo, .news')[:5]
-        
-        for card in news_cards:
-            try:
-                # Título (múltiplas tentativas)
-                titulo_elem = (
-                    card.select_one('h3 a') or 
-                    card.select_one('h4 a') or
-                    card.select_one('.title a') or
-                    card.select_one('a[href*="http"]')
-                )
-                titulo = limpar_texto(titulo_elem.get_text()) if titulo_elem else None
-                
-                # Link
-                link = titulo_elem.get('href') if titulo_elem else None
-                
-                # Resumo
-                resumo_elem = (
-                    card.select_one('.snippet') or
-                    card.select_one('.caption') or
-                    card.select_one('.description') or
-                    card.select_one('p')
-                )
-                resumo = limpar_texto(resumo_elem.get_text()) if resumo_elem else None
-                
-                # Imagem
-                imagem_elem = (
-                    card.select_one('.newsimg img') or
-                    card.select_one('.img img') or
-                    card.select_one('img')
-                )
-                imagem = None
-                if imagem_elem:
-                    imagem = imagem_elem.get('src') or imagem_elem.get('data-src')
-                    # Validar se é uma imagem real
-                    if imagem and any(ext in imagem.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
-                        if imagem.startswith('//'):
-                            imagem = 'https:' + imagem
-                        elif imagem.startswith('/'):
-                            imagem = 'https://www.bing.com' + imagem
-                
-                # Data/fonte
-                data_elem = (
-                    card.select_one('.source .timestamp') or
-                    card.select_one('.published') or
-                    card.select_one('time') or
-                    card.select_one('.cite')
-                )
-                data = limpar_texto(data_elem.get_text()) if data_elem else "Recente"
-                
-                # Validar notícia
-                if titulo and link and len(titulo) > 10:
-                    # Normalizar link
-                    if link.startswith('//'):
-                        link = 'https:' + link
-                    elif not link.startswith('http'):
-                        link = 'https://www.bing.com' + link
-                    
-                    # Filtrar notícias relevantes para Paraná/Paranavaí
-                    titulo_lower = titulo.lower()
-                    resumo_lower = (resumo or '').lower()
-                    
-                    if any(termo in titulo_lower or termo in resumo_lower for termo in 
-                           ['paraná', 'parana', 'paranavaí', 'paranavai', 'noroeste', 'maringá', 'londrina']):
-                        
-                        noticia = {
-                            "titulo": titulo,
-                            "resumo": resumo or titulo[:150] + "...",
-                            "link": link,
-                            "imagem": imagem or f"https://via.placeholder.com/400x300/{portal['cor'][1:]}/ffffff?text=Bing+News",
-                            "data": data,
-                            "fonte": portal['nome'],
-                            "corFonte": portal['cor'],
-                            "logoFonte": portal['logo'],
-                            "coletadoEm": datetime.now().isoformat(),
-                            "tipoFonte": "bing_news"
-                        }
-                        
-                        noticias.append(noticia)
-                        
-            except Exception as e:
-                print(f"   ⚠️  Erro ao processar card Bing: {e}")
-                continue
+        noticias = extrair_da_pagina(portal, response.content, metrica, processos)
+        if cache is not None:
+            cache.registrar(portal['busca'], response, noticias)
         
         print(f"   ✅ {len(noticias)} notícias relevantes coletadas do Bing News")
         return noticias
         
     except Exception as e:
         print(f"   ❌ Erro ao acessar Bing News: {e}")
+        if metrica is not None:
+            metrica['erro'] = type(e).__name__
         return []
 
-def extrair_noticias_portal(portal, sessao):
-    """Extrai notícias de um portal específico"""
+def parsear_noticias_bing(portal, conteudo, backend=None, parcial=True, metrica=None):
+    """Extrai as notícias relevantes de uma página de resultados do Bing News"""
+    limite = portal.get('limite', MAX_NOTICIAS_POR_PORTAL)
+    noticias = []
+    
+    # Seletores específicos do Bing News
+    inicio = time.perf_counter()
+    soup, news_cards = selecionar_containers(
+        conteudo, '.news-card, .newsitem, [aria-label*="notícia"], [data-module="NewsArticle"]',
+        limite, backend, parcial
+    )
+    
+    if not news_cards:
+        # Fallback para outros seletores do Bing
+        news_cards = soup.select('article, .b_algo, .news')[:limite]
+    
+    if metrica is not None:
+        metrica['parseMs'] = ms_desde(inicio)
+        metrica['containers'] = len(news_cards)
+    inicio = time.perf_counter()
+    
+    for card in news_cards:
+        try:
+            # Título (múltiplas tentativas)
+            titulo_elem = (
+                card.select_one('h3 a') or 
+                card.select_one('h4 a') or
+                card.select_one('.title a') or
+                card.select_one('a[href*="http"]')
+            )
+            titulo = limpar_texto(titulo_elem.get_text()) if titulo_elem else None
+            
+            # Link
+            link = titulo_elem.get('href') if titulo_elem else None
+            
+            # Resumo
+            resumo_elem = (
+                card.select_one('.snippet') or
+                card.select_one('.caption') or
+                card.select_one('.description') or
+                card.select_one('p')
+            )
+            resumo = limpar_texto(resumo_elem.get_text()) if resumo_elem else None
+            
+            # Imagem
+            imagem_elem = (
+                card.select_one('.newsimg img') or
+                card.select_one('.img img') or
+                card.select_one('img')
+            )
+            imagem = None
+            if imagem_elem:
+                imagem = imagem_elem.get('src') or imagem_elem.get('data-src')
+                # Validar se é uma imagem real
+                if imagem and any(ext in imagem.lower() for ext in ['.jpg', '.jpeg', '.png', '.webp']):
+                    if imagem.startswith('//'):
+                        imagem = 'https:' + imagem
+                    elif imagem.startswith('/'):
+                        imagem = 'https://www.bing.com' + imagem
+            
+            # Data/fonte
+            data_elem = (
+                card.select_one('.source .timestamp') or
+                card.select_one('.published') or
+                card.select_one('time') or
+                card.select_one('.cite')
+            )
+            data = limpar_texto(data_elem.get_text()) if data_elem else "Recente"
+            data_iso = normalizar_data(data, data_elem.get('datetime'), portal['nome']) if data_elem else None
+            
+            # Validar notícia
+            if titulo and link and len(titulo) > 10:
+                # Normalizar link
+                if link.startswith('//'):
+                    link = 'https:' + link
+                elif not link.startswith('http'):
+                    link = 'https://www.bing.com' + link
+                
+                noticia = {
+                    "titulo": titulo,
+                    "resumo": resumo or titulo[:150] + "...",
+                    "link": link,
+                    "imagem": imagem or f"https://via.placeholder.com/400x300/{portal['cor'][1:]}/ffffff?text=Bing+News",
+                    "data": data,
+                    "dataISO": data_iso,
+                    "fonte": portal['nome'],
+                    "corFonte": portal['cor'],
+                    "logoFonte": portal['logo'],
+                    "coletadoEm": datetime.now().isoformat(),
+                    "tipoFonte": "bing_news"
+                }
+                
+                noticias.append(noticia)
+                
+        except Exception as e:
+            print(f"   ⚠️  Erro ao processar card Bing: {e}")
+            continue
+    
+    noticias = aplicar_relevancia(portal, noticias)
+    if metrica is not None:
+        metrica['extracaoMs'] = ms_desde(inicio)
+    return noticias
+
+def extrair_noticias_portal(portal, sessao, cache=None, metrica=None, agendador=None, processos=None):
+    """Extrai notícias de um portal específico
+
+    Com ``processos`` (um ProcessPoolExecutor), a thread que baixou a
+    página envia o parse para um processo de trabalho e espera o resultado,
+    liberando o GIL para os downloads dos outros portais.
+    """
     try:
         # Verificar se é Bing News (tratamento especial)
         if portal.get('tipo') == 'bing_news':
-            return extrair_noticias_bing(portal, sessao)
+            return extrair_noticias_bing(portal, sessao, cache, metrica, agendador, processos)
         
         print(f"🔍 Coletando de: {portal['nome']}")
         
-        response = sessao.get(portal['busca'], timeout=15)
-        response.raise_for_status()
+        response = baixar_pagina(sessao, portal['busca'], timeout=15, headers=cabecalhos_portal(portal),
+                                 cache=cache, metrica=metrica, agendador=agendador)
+        if response.status_code == 304:
+            return reaproveitar_noticias(portal, cache)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
-        noticias = []
-        
-        # Buscar artigos
-        containers = soup.select(portal['selectors']['container'])[:5]  # Máximo 5 por portal
-        
-        for container in containers:
-            try:
-                # Extrair dados
-                titulo_elem = container.select_one(portal['selectors']['titulo'])
-                titulo = limpar_texto(titulo_elem.get_text()) if titulo_elem else None
-                
-                link_elem = container.select_one(portal['selectors']['link'])
-                link = link_elem.get('href') if link_elem else None
-                
-                resumo_elem = container.select_one(portal['selectors']['resumo'])
-                resumo = limpar_texto(resumo_elem.get_text()) if resumo_elem else titulo
-                
-                imagem_elem = container.select_one(portal['selectors']['imagem'])
-                imagem = imagem_elem.get('src') or imagem_elem.get('data-src') if imagem_elem else None
-                
-                data_elem = container.select_one(portal['selectors']['data'])
-                data = limpar_texto(data_elem.get_text()) if data_elem else "Hoje"
-                
-                # Validar dados essenciais
-                if titulo and link:
-                    # Normalizar URLs para garantir links completos
-                    if link and not link.startswith('http'):
-                        if link.startswith('/'):
-                            link = portal['url'] + link
-                        else:
-                            link = portal['url'] + '/' + link
-                    
-                    # Garantir que o link seja válido e acessível
-                    try:
-                        from urllib.parse import urljoin
-                        link = urljoin(portal['url'], link)
-                    except:
-                        link = portal['url']  # Fallback para URL do portal
-                    
-                    if imagem and not imagem.startswith('http'):
-                        if imagem.startswith('/'):
-                            imagem = portal['url'] + imagem
-                        else:
-                            imagem = portal['url'] + '/' + imagem
-                    
-                    # Limitar tamanho do resumo
-                    if resumo and len(resumo) > 250:
-                        resumo = resumo[:250] + "..."
-                    
-                    noticia = {
-                        "titulo": titulo,
-                        "resumo": resumo or titulo[:150] + "...",
-                        "link": link,  # Link específico da notícia do portal parceiro
-                        "imagem": imagem or f"https://via.placeholder.com/400x300/{portal['cor'][1:]}/ffffff?text={portal['nome'].replace(' ', '+')}",
-                        "data": data,
-                        "fonte": portal['nome'],
-                        "corFonte": portal['cor'],
-                        "logoFonte": portal['logo'],
-                        "coletadoEm": datetime.now().isoformat(),
-                        "urlOriginal": link  # Para garantir que temos o link original
-                    }
-                    
-                    noticias.append(noticia)
-                    
-            except Exception as e:
-                print(f"   ⚠️  Erro ao processar container: {e}")
-                continue
+        noticias = extrair_da_pagina(portal, response.content, metrica, processos)
+        if cache is not None:
+            cache.registrar(portal['busca'], response, noticias)
         
         print(f"   ✅ {len(noticias)} notícias coletadas de {portal['nome']}")
         return noticias
         
     except Exception as e:
         print(f"   ❌ Erro ao acessar {portal['nome']}: {e}")
+        if metrica is not None:
+            metrica['erro'] = type(e).__name__
         return []
 
-def coletar_todas_noticias():
-    """Coleta notícias de todos os portais"""
+def parsear_noticias_portal(portal, conteudo, backend=None, parcial=True, metrica=None):
+    """Extrai as notícias de uma página de busca usando os seletores do portal"""
+    plano = plano_seletores(portal)
+    noticias = []
+    
+    # Buscar artigos (parse interrompido após os primeiros containers)
+    inicio = time.perf_counter()
+    _, containers = selecionar_containers(
+        conteudo, plano['container'],
+        portal.get('limite', MAX_NOTICIAS_POR_PORTAL), backend, parcial
+    )
+    if metrica is not None:
+        metrica['parseMs'] = ms_desde(inicio)
+        metrica['containers'] = len(containers)
+    inicio = time.perf_counter()
+    
+    for container in containers:
+        try:
+            # Extrair dados
+            titulo_elem = container.select_one(plano['titulo'])
+            titulo = limpar_texto(titulo_elem.get_text()) if titulo_elem else None
+            
+            link_elem = container.select_one(plano['link'])
+            link = link_elem.get('href') if link_elem else None
+            
+            resumo_elem = container.select_one(plano['resumo'])
+            resumo = limpar_texto(resumo_elem.get_text()) if resumo_elem else titulo
+            
+            imagem_elem = container.select_one(plano['imagem'])
+            imagem = imagem_elem.get('src') or imagem_elem.get('data-src') if imagem_elem else None
+            
+            data_elem = container.select_one(plano['data'])
+            data = limpar_texto(data_elem.get_text()) if data_elem else "Hoje"
+            data_iso = normalizar_data(data, data_elem.get('datetime'), portal['nome']) if data_elem else None
+            
+            # Validar dados essenciais
+            if titulo and link:
+                # Normalizar URLs para garantir links completos
+                if link and not link.startswith('http'):
+                    if link.startswith('/'):
+                        link = portal['url'] + link
+                    else:
+                        link = portal['url'] + '/' + link
+                
+                # Garantir que o link seja válido e acessível
+                try:
+                    from urllib.parse import urljoin
+                    link = urljoin(portal['url'], link)
+                except:
+                    link = portal['url']  # Fallback para URL do portal
+                
+                if imagem and not imagem.startswith('http'):
+                    if imagem.startswith('/'):
+                        imagem = portal['url'] + imagem
+                    else:
+                        imagem = portal['url'] + '/' + imagem
+                
+                # Limitar tamanho do resumo
+                if resumo and len(resumo) > 250:
+                    resumo = resumo[:250] + "..."
+                
+                noticia = {
+                    "titulo": titulo,
+                    "resumo": resumo or titulo[:150] + "...",
+                    "link": link,  # Link específico da notícia do portal parceiro
+                    "imagem": imagem or f"https://via.placeholder.com/400x300/{portal['cor'][1:]}/ffffff?text={portal['nome'].replace(' ', '+')}",
+                    "data": data,
+                    "dataISO": data_iso,
+                    "fonte": portal['nome'],
+                    "corFonte": portal['cor'],
+                    "logoFonte": portal['logo'],
+                    "coletadoEm": datetime.now().isoformat(),
+                    "urlOriginal": link  # Para garantir que temos o link original
+                }
+                
+                noticias.append(noticia)
+                
+        except Exception as e:
+            print(f"   ⚠️  Erro ao processar container: {e}")
+            continue
+    
+    noticias = aplicar_relevancia(portal, noticias)
+    if metrica is not None:
+        metrica['extracaoMs'] = ms_desde(inicio)
+    return noticias
+
+def coletar_portais(portais, sessao, cache, metricas, agendador, max_conexoes=MAX_CONEXOES_SIMULTANEAS,
+                    ao_concluir_portal=None, processos=None):
+    """Consulta ``portais`` em paralelo; retorna pares (notícias, métrica) na ordem dos portais
+
+    Os downloads rodam em threads; com ``processos`` (um ProcessPoolExecutor)
+    o parse de cada página vai para um processo de trabalho.
+    """
+    def coletar_portal(portal):
+        metrica = metricas.iniciar(portal)
+        noticias = extrair_noticias_portal(portal, sessao, cache, metrica, agendador, processos)
+        metricas.concluir(metrica, noticias)
+        if ao_concluir_portal is not None:
+            ao_concluir_portal(portal, noticias)
+        return noticias, metrica
+    
+    # map preserva a ordem dos portais nos resultados
+    with ThreadPoolExecutor(max_workers=max(1, max_conexoes)) as executor:
+        return list(executor.map(coletar_portal, portais))
+
+def montar_feed(todas_noticias, indice=None, anteriores=None, vistas=None, momento=None):
+    """Monta o feed a partir das notícias coletadas: índice, duplicatas e seleção
+
+    ``anteriores`` são as notícias do feed anterior e ``vistas`` (uma
+    ``PrimeiraColeta``) as datas de primeira coleta de cada link; links
+    novos recebem ``momento``. Assim a mesma coleta gera exatamente o
+    mesmo feed (veja ``preservar_coleta``).
+    """
+    todas_noticias = preservar_coleta(todas_noticias, anteriores, vistas, momento)
+    if indice is not None:
+        novas, alteradas = indice.mesclar(todas_noticias)
+        print(f"🗂️  Índice: {len(novas)} notícias novas, {len(alteradas)} alteradas")
+        todas_noticias = indice.noticias()
+    
+    # A mesma matéria costuma aparecer em vários portais e no Bing News
+    total_antes = len(todas_noticias)
+    todas_noticias = remover_duplicatas(todas_noticias)
+    if len(todas_noticias) < total_antes:
+        print(f"🧹 {total_antes - len(todas_noticias)} notícias duplicadas removidas")
+    
+    # Relevância e recência, com cota por fonte, em ordem determinística
+    return selecionar_feed(todas_noticias)
+
+def coletar_todas_noticias(max_conexoes=MAX_CONEXOES_SIMULTANEAS, indice=None, ao_concluir_portal=None,
+                           metricas=None, agendador=None, sessao=None, anteriores=None, processos_parse=0):
+    """Coleta notícias de todos os portais em paralelo
+
+    ``max_conexoes`` limita quantos portais são consultados ao mesmo tempo
+    (1 reproduz a coleta sequencial). O intervalo entre requisições é
+    aplicado por host pelo ``agendador``, que se adapta à latência e aos
+    erros de cada portal e repete falhas transitórias; passe o mesmo
+    agendador entre coletas para que ele se lembre do estado dos hosts.
+    Sem ``sessao``, usa a sessão compartilhada do processo, que mantém as
+    conexões abertas entre portais e entre coletas.
+
+    Com um ``IndiceNoticias``, apenas notícias novas ou alteradas são
+    gravadas e o feed é montado a partir das notícias recentes do índice.
+    ``ao_concluir_portal(portal, noticias)`` é chamado assim que cada portal
+    termina, possivelmente de outra thread. As métricas de cada portal vão
+    para ``metricas`` (um ``RegistroMetricas``) e são gravadas em JSON lines.
+    Sem ``anteriores``, as datas de coleta são preservadas a partir do feed
+    publicado em ``ARQUIVO_FEED``; links fora dele mantêm a data da primeira
+    coleta, guardada em ``ARQUIVO_PRIMEIRA_COLETA``. Com ``processos_parse`` > 0, o parse das
+    páginas usa um pool com esse número de processos.
+    """
     print("🚀 Iniciando coleta de notícias dos portais parceiros...")
+    momento = datetime.now().isoformat()
     
-    sessao = criar_sessao()
-    todas_noticias = []
+    if anteriores is None:
+        anteriores = (ler_json(ARQUIVO_FEED) or {}).get('noticias')
     
-    for portal in PORTAIS_PARCEIROS:
-        noticias = extrair_noticias_portal(portal, sessao)
-        todas_noticias.extend(noticias)
-        
-        # Pausa entre requests
-        time.sleep(2)
+    sessao = sessao if sessao is not None else obter_sessao()
+    agendador = agendador if agendador is not None else AgendadorHosts()
+    cache = CacheValidadores()
+    metricas = metricas if metricas is not None else RegistroMetricas()
+    
+    processos = criar_processos_parse(processos_parse)
+    try:
+        resultados = coletar_portais(PORTAIS_PARCEIROS, sessao, cache, metricas, agendador,
+                                     max_conexoes, ao_concluir_portal, processos)
+    finally:
+        if processos is not None:
+            processos.shutdown()
     
-    # Embaralhar notícias para variedade
-    import random
-    random.shuffle(todas_noticias)
+    cache.salvar()
+    metricas.salvar()
     
-    # Limitar a 15 notícias
-    todas_noticias = todas_noticias[:15]
+    todas_noticias = []
+    for noticias, _ in resultados:
+        todas_noticias.extend(noticias)
+    
+    vistas = PrimeiraColeta()
+    todas_noticias = montar_feed(todas_noticias, indice, anteriores, vistas, momento)
+    vistas.salvar()
     
     print(f"\n✅ Total coletado: {len(todas_noticias)} notícias")
     return todas_noticias
 
-def salvar_noticias(noticias):
+def salvar_noticias(noticias, versao=None):
     """Salva notícias em arquivo JSON"""
     data_coleta = {
         "ultimaAtualizacao": datetime.now().isoformat(),
+        "versao": versao or versao_feed(noticias),
         "totalNoticias": len(noticias),
         "portaisConsultados": len(PORTAIS_PARCEIROS),
         "noticias": noticias
     }
     
-    # Criar diretório se não existir
-    os.makedirs('cache', exist_ok=True)
-    
-    # Salvar em JSON
-    with open('cache/noticias_parceiros.json', 'w', encoding='utf-8') as f:
-        json.dump(data_coleta, f, ensure_ascii=False, indent=2)
+    # Salvar em JSON (escrita atômica, o diretório é criado se não existir)
+    escrever_atomico(ARQUIVO_FEED, json.dumps(data_coleta, ensure_ascii=False, indent=2))
     
-    print(f"💾 Notícias salvas em: cache/noticias_parceiros.json")
+    print(f"💾 Notícias salvas em: {ARQUIVO_FEED}")
     
     return data_coleta
 
+class EscritorNDJSON:
+    """Grava notícias em NDJSON, uma por linha
+
+    Durante a coleta as notícias brutas de cada portal vão para
+    ``<caminho>.parcial`` assim que ele conclui, então leitores podem
+    acompanhá-lo com ``tail``. Ao fechar, o arquivo definitivo recebe o feed
+    selecionado (o mesmo do JSON e do HTML, com a mesma versão), de forma
+    atômica, e um manifesto pequeno é gravado com a data, a versão e as
+    contagens; o parcial é removido.
+    """
+
+    def __init__(self, caminho=ARQUIVO_NDJSON, caminho_manifesto=ARQUIVO_MANIFESTO):
+        os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+        self.caminho = caminho
+        self.caminho_parcial = caminho + '.parcial'
+        self.caminho_manifesto = caminho_manifesto
+        self.total = 0
+        self.por_fonte = {}
+        self._trava = threading.Lock()
+        self._arquivo = open(self.caminho_parcial, 'w', encoding='utf-8')
+
+    def escrever_portal(self, portal, noticias):
+        with self._trava:
+            if self._arquivo is None:
+                return
+            for noticia in noticias:
+                self._arquivo.write(json.dumps(noticia, ensure_ascii=False) + '\n')
+            self._arquivo.flush()
+            self.total += len(noticias)
+            self.por_fonte[portal['nome']] = len(noticias)
+
+    def descartar(self):
+        """Fecha e remove o arquivo parcial sem publicar nada"""
+        with self._trava:
+            if self._arquivo is None:
+                return
+            self._arquivo.close()
+            self._arquivo = None
+            try:
+                os.unlink(self.caminho_parcial)
+            except OSError:
+                pass
+
+    def fechar(self, noticias, versao=None):
+        """Publica ``noticias`` (o feed selecionado) em NDJSON e grava o manifesto"""
+        self.descartar()
+        
+        escrever_atomico(self.caminho, ''.join(json.dumps(n, ensure_ascii=False) + '\n' for n in noticias))
+        
+        por_fonte = {}
+        for noticia in noticias:
+            por_fonte[noticia['fonte']] = por_fonte.get(noticia['fonte'], 0) + 1
+        manifesto = {
+            "ultimaAtualizacao": datetime.now().isoformat(),
+            "versao": versao or versao_feed(noticias),
+            "totalNoticias": len(noticias),
+            "portaisConsultados": len(self.por_fonte),
+            "noticiasPorFonte": por_fonte,
+            "coletadasPorFonte": self.por_fonte,  # antes de duplicatas, seleção e limite do feed
+            "arquivo": os.path.basename(self.caminho)
+        }
+        escrever_atomico(self.caminho_manifesto, json.dumps(manifesto, ensure_ascii=False, indent=2))
+        
+        print(f"💾 Notícias salvas em: {self.caminho} (manifesto: {self.caminho_manifesto})")
+        return manifesto
+
 def gerar_html_noticias(noticias):
     """Gera HTML para inserir nas notícias em destaque"""
     html_cards = []
@@ -424,6 +842,11 @@ def gerar_html_noticias(noticias):
     
     return '\n'.join(html_cards)
 
+def salvar_html(noticias, versao):
+    """Grava o HTML das notícias marcado com a mesma versão do JSON"""
+    html = gerar_html_noticias(noticias)
+    escrever_atomico('cache/noticias_html.html', f"<!-- versao: {versao} -->\n{html}")
+
 def criar_javascript_integracao():
     """Cria JavaScript para integração com o frontend"""
     js_code = '''
@@ -618,25 +1041,266 @@ document.addEventListener('DOMContentLoaded', function() {
 '''
     
     # Salvar JavaScript
-    with open('assets/js/noticias-parceiros.js', 'w', encoding='utf-8') as f:
-        f.write(js_code)
+    escrever_atomico('assets/js/noticias-parceiros.js', js_code)
     
     print("📄 JavaScript de integração criado: assets/js/noticias-parceiros.js")
 
-def main():
-    """Função principal"""
+def assinatura_portal(noticias):
+    """Hash do conteúdo das notícias de um portal, ignorando a data de coleta"""
+    assinaturas = sorted(assinatura_noticia(n) for n in noticias)
+    return hashlib.sha1(''.join(assinaturas).encode('ascii')).hexdigest()
+
+class ServicoNoticias:
+    """Coleta contínua em um processo de longa duração
+
+    Mantém em memória a sessão HTTP, o agendador de hosts, os validadores,
+    as notícias de cada portal e o feed atual. Cada portal é consultado no
+    seu próprio intervalo (``portal['intervalo']`` em segundos, ou
+    ``intervalo``); o feed só é remontado e os arquivos só são regravados
+    quando o conteúdo de algum portal mudou. Um portal que falha mantém as
+    notícias da consulta anterior.
+    """
+
+    def __init__(self, portais=None, intervalo=INTERVALO_ATUALIZACAO, max_conexoes=MAX_CONEXOES_SIMULTANEAS,
+                 indice=None, sessao=None, processos_parse=0):
+        self.portais = portais if portais is not None else PORTAIS_PARCEIROS
+        self.intervalo = intervalo
+        self.max_conexoes = max_conexoes
+        self.indice = indice
+        self.sessao = sessao if sessao is not None else obter_sessao()
+        self.agendador = AgendadorHosts()
+        self.cache = CacheValidadores()
+        self.vistas = PrimeiraColeta()
+        self.processos = criar_processos_parse(processos_parse)
+        self.noticias_por_portal = {}
+        self.assinaturas = {}
+        self.proxima_coleta = {portal['nome']: 0.0 for portal in self.portais}
+        # Começa com o último feed publicado, se houver
+        publicado = ler_json(ARQUIVO_FEED) or {}
+        self.noticias = publicado.get('noticias', [])
+        self.versao = publicado.get('versao')
+        self.dados = publicado or None
+        self._trava = threading.Lock()
+        self._trava_atualizacao = threading.Lock()
+        self._execucao = ExecucaoUnica()
+        self._ultima_completa = False  # a última publicação deste serviço consultou todos os portais
+        self._parar = threading.Event()
+
+    def intervalo_portal(self, portal):
+        return portal.get('intervalo', self.intervalo)
+
+    def portais_pendentes(self, agora=None):
+        """Portais cujo intervalo já venceu"""
+        agora = time.monotonic() if agora is None else agora
+        return [p for p in self.portais if self.proxima_coleta[p['nome']] <= agora]
+
+    def feed(self):
+        """Retorna (notícias, versão, dados publicados) do feed atual"""
+        with self._trava:
+            return list(self.noticias), self.versao, self.dados
+
+    def atualizar(self, portais=None):
+        """Consulta ``portais`` (padrão: os pendentes) e republica o feed se algo mudou
+
+        Retorna True se o feed mudou. Chamadas simultâneas para os mesmos
+        portais (todas as atualizações completas têm a mesma chave) se juntam
+        à atualização em andamento e recebem o seu resultado; as demais são
+        executadas uma de cada vez. A trava em arquivo faz uma coleta avulsa
+        (cron) esperar esta e vice-versa; uma atualização completa que
+        esperou por outra usa o feed que ela acabou de publicar.
+        """
+        portais = portais if portais is not None else self.portais_pendentes()
+        nomes = frozenset(portal['nome'] for portal in portais)
+        chave = 'completa' if nomes == frozenset(self.proxima_coleta) else tuple(sorted(nomes))
+        resultado, _ = self._execucao.executar(chave, self._atualizar_com_trava, portais, chave == 'completa')
+        return resultado
+
+    def _atualizar_com_trava(self, portais, completa=False):
+        inicio = time.time()
+        versao = self.versao
+        with self._trava_atualizacao, TravaArquivo():
+            if completa and self._reaproveitar_publicado(inicio):
+                return self.versao != versao
+            return self._atualizar(portais)
+
+    def _reaproveitar_publicado(self, desde):
+        """Adota o feed completo publicado depois de ``desde``, por outro processo ou por este
+
+        Retorna False se o feed em disco for anterior, ou se for a
+        publicação de uma atualização parcial deste serviço.
+        """
+        try:
+            if os.path.getmtime(ARQUIVO_FEED) < desde:
+                return False
+        except OSError:
+            return False
+        publicado = ler_json(ARQUIVO_FEED)
+        if not publicado or not publicado.get('noticias'):
+            return False
+        if publicado.get('versao') == self.versao and not self._ultima_completa:
+            return False
+
+        if publicado.get('versao') != self.versao:
+            # Publicado por outra coleta: as notícias de cada portal passam a ser as do feed
+            por_portal = {}
+            for noticia in publicado['noticias']:
+                por_portal.setdefault(noticia['fonte'], []).append(noticia)
+            for nome, noticias in por_portal.items():
+                self.noticias_por_portal[nome] = noticias
+                self.assinaturas[nome] = assinatura_portal(noticias)
+            with self._trava:
+                self.noticias, self.versao, self.dados = publicado['noticias'], publicado.get('versao'), publicado
+            self._ultima_completa = True
+            agora = time.monotonic()
+            for portal in self.portais:
+                self.proxima_coleta[portal['nome']] = agora + self.intervalo_portal(portal)
+
+        print(f"♻️  Feed {self.versao} publicado enquanto esta atualização esperava: reaproveitado")
+        return True
+
+    def _atualizar(self, portais):
+        if not portais:
+            return False
+        
+        print(f"🔄 Atualizando {len(portais)} portais...")
+        momento = datetime.now().isoformat()
+        metricas = RegistroMetricas()
+        resultados = coletar_portais(portais, self.sessao, self.cache, metricas, self.agendador,
+                                     self.max_conexoes, processos=self.processos)
+        self.cache.salvar()
+        metricas.salvar()
+        
+        alterados = []
+        agora = time.monotonic()
+        for portal, (noticias, metrica) in zip(portais, resultados):
+            nome = portal['nome']
+            self.proxima_coleta[nome] = agora + self.intervalo_portal(portal)
+            if metrica['erro'] and nome in self.noticias_por_portal:
+                continue
+            
+            assinatura = assinatura_portal(noticias)
+            if self.assinaturas.get(nome) != assinatura:
+                self.assinaturas[nome] = assinatura
+                self.noticias_por_portal[nome] = noticias
+                alterados.append(nome)
+        
+        if not alterados and self.dados is not None:
+            print("♻️  Nenhum portal mudou: feed mantido")
+            return False
+        
+        todas_noticias = []
+        for portal in self.portais:
+            todas_noticias.extend(self.noticias_por_portal.get(portal['nome'], []))
+        noticias = montar_feed(todas_noticias, self.indice, self.noticias, self.vistas, momento)
+        self.vistas.salvar()
+        if not noticias:
+            print("❌ Nenhuma notícia foi coletada")
+            return False
+        
+        versao = versao_feed(noticias)
+        if versao == self.versao:
+            print("♻️  Feed idêntico ao publicado: arquivos mantidos")
+            return False
+        dados = salvar_noticias(noticias, versao)
+        salvar_html(noticias, versao)
+        with self._trava:
+            self.noticias, self.versao, self.dados = noticias, versao, dados
+        self._ultima_completa = len(portais) == len(self.portais)
+        
+        print(f"📰 Feed {versao} publicado: {len(noticias)} notícias ({', '.join(alterados)} mudaram)")
+        return True
+
+    def executar(self):
+        """Laço principal: atualiza os portais pendentes até ``parar()``"""
+        print(f"🛰️  Modo contínuo: {len(self.portais)} portais, intervalo padrão de {self.intervalo:.0f}s")
+        criar_javascript_integracao()
+        try:
+            while not self._parar.is_set():
+                try:
+                    self.atualizar()
+                except Exception as e:
+                    print(f"💥 Erro na atualização: {e}")
+                
+                espera = min(self.proxima_coleta.values()) - time.monotonic()
+                self._parar.wait(max(1.0, espera))
+        finally:
+            if self.processos is not None:
+                self.processos.shutdown()
+            if self.indice is not None:
+                self.indice.fechar()
+
+    def parar(self):
+        self._parar.set()
+
+def ler_json(caminho):
+    """Conteúdo de um artefato JSON já publicado, ou None"""
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def aguardar_coleta_em_andamento(trava, formato='json'):
+    """Espera a coleta de outro processo e reaproveita o feed que ela publicou"""
+    print("⏳ Outra coleta já está em andamento: aguardando o resultado dela...")
+    trava.esperar()
+    
+    dados = ler_json(ARQUIVO_MANIFESTO if formato == 'ndjson' else ARQUIVO_FEED)
+    if dados is None:
+        print("❌ A coleta em andamento não publicou um feed")
+        return False
+    print(f"♻️  Feed da coleta concorrente reaproveitado: {dados['totalNoticias']} notícias "
+          f"(versão {dados.get('versao')}, {dados['ultimaAtualizacao']})")
+    return True
+
+def main(incremental=False, formato='json', processos_parse=0):
+    """Função principal
+
+    Se outro processo já estiver coletando, espera por ele e usa o feed
+    publicado em vez de consultar os portais de novo.
+    """
+    trava = TravaArquivo()
+    if not trava.adquirir(bloquear=False):
+        return aguardar_coleta_em_andamento(trava, formato)
+    
+    try:
+        return coletar_e_publicar(incremental, formato, processos_parse)
+    finally:
+        trava.liberar()
+
+def coletar_e_publicar(incremental=False, formato='json', processos_parse=0):
+    """Coleta os portais e grava os artefatos do feed"""
+    indice = IndiceNoticias() if incremental else None
+    escritor = EscritorNDJSON() if formato == 'ndjson' else None
+    metricas = RegistroMetricas()
+    arquivo_dados = ARQUIVO_NDJSON if escritor else ARQUIVO_FEED
     try:
         # Coletar notícias
-        noticias = coletar_todas_noticias()
+        noticias = coletar_todas_noticias(
+            indice=indice,
+            ao_concluir_portal=escritor.escrever_portal if escritor else None,
+            metricas=metricas,
+            processos_parse=processos_parse
+        )
+        versao = versao_feed(noticias)
+        publicado = ler_json(ARQUIVO_MANIFESTO if escritor else ARQUIVO_FEED) or {}
         
-        if noticias:
+        if indice is not None and not indice.houve_alteracoes and os.path.exists(arquivo_dados):
+            print("♻️  Nenhuma notícia nova ou alterada: arquivos mantidos")
+        
+        elif versao == publicado.get('versao') and os.path.exists(arquivo_dados):
+            # Regravar mudaria só a data e invalidaria os caches (ETag) à toa
+            print(f"♻️  Feed idêntico ao publicado (versão {versao}): arquivos mantidos")
+        
+        elif noticias:
             # Salvar dados
-            dados = salvar_noticias(noticias)
+            if escritor is not None:
+                dados = escritor.fechar(noticias, versao)
+            else:
+                dados = salvar_noticias(noticias, versao)
             
-            # Gerar HTML
-            html = gerar_html_noticias(noticias)
-            with open('cache/noticias_html.html', 'w', encoding='utf-8') as f:
-                f.write(html)
+            # Gerar HTML com a mesma versão do JSON
+            salvar_html(noticias, versao)
             
             # Criar JavaScript
             criar_javascript_integracao()
@@ -646,7 +1310,7 @@ def main():
             print(f"   - Total de notícias: {len(noticias)}")
             print(f"   - Portais consultados: {len(PORTAIS_PARCEIROS)}")
             print(f"   - Última atualização: {dados['ultimaAtualizacao']}")
-            print(f"   - Arquivo JSON: cache/noticias_parceiros.json")
+            print(f"   - Arquivo de dados: {arquivo_dados}")
             print(f"   - Arquivo HTML: cache/noticias_html.html")
             print(f"   - JavaScript: assets/js/noticias-parceiros.js")
             
@@ -661,6 +1325,8 @@ def main():
             print(f"\n📰 Notícias por fonte:")
             for fonte, count in fontes.items():
                 print(f"   - {fonte}: {count} notícias")
+            
+            metricas.resumo()
                 
         else:
             print("❌ Nenhuma notícia foi coletada")
@@ -669,6 +1335,12 @@ def main():
         print(f"💥 Erro crítico: {e}")
         return False
     
+    finally:
+        if escritor is not None:
+            escritor.descartar()  # sem publicação, o parcial não fica para trás
+        if indice is not None:
+            indice.fechar()
+    
     return True
 
 if __name__ == "__main__":
@@ -682,4 +1354,28 @@ if __name__ == "__main__":
         import requests
         from bs4 import BeautifulSoup
     
-    main()
+    import argparse
+    parser = argparse.ArgumentParser(description="Coleta notícias dos portais parceiros")
+    parser.add_argument('--incremental', action='store_true',
+                        help='grava apenas notícias novas ou alteradas no índice (cache/indice_noticias.sqlite3)')
+    parser.add_argument('--formato', choices=('json', 'ndjson'), default='json',
+                        help='json grava o feed completo; ndjson grava o feed uma notícia por linha, com manifesto, '
+                             'e acompanha cada portal ao terminar em um arquivo .parcial')
+    parser.add_argument('--daemon', action='store_true',
+                        help='mantém o processo em execução, atualizando cada portal no seu intervalo')
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_ATUALIZACAO,
+                        help='intervalo padrão entre consultas a cada portal no modo contínuo (segundos)')
+    parser.add_argument('--processos', type=int, default=0,
+                        help='faz o parse das páginas em N processos (0: nas mesmas threads dos downloads)')
+    args = parser.parse_args()
+    
+    if args.daemon:
+        servico = ServicoNoticias(intervalo=args.intervalo,
+                                  indice=IndiceNoticias() if args.incremental else None,
+                                  processos_parse=args.processos)
+        try:
+            servico.executar()
+        except KeyboardInterrupt:
+            print("\n👋 Modo contínuo encerrado")
+    else:
+        main(incremental=args.incremental, formato=args.formato, processos_parse=args.processos)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP local do feed de notícias parceiras
+Atende /api/noticias direto da memória do ServicoNoticias (corpos
+pré-comprimidos, ETag forte e 304) e /api/atualizar, que dispara uma
+única atualização em segundo plano
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import threading
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from deduplicacao import remover_acentos
+from scraper_avancado import INTERVALO_ATUALIZACAO, PORTAIS_PARCEIROS, ServicoNoticias
+
+HOST = '127.0.0.1'
+PORTA = 3000  # a mesma porta esperada pelo JavaScript de integração
+
+TEMPO_OCIOSO = 15  # segundos que uma conexão keep-alive espera pela próxima requisição
+TAMANHO_MAXIMO_CABECALHOS = 16 * 1024
+TAMANHO_MINIMO_COMPRESSAO = 512  # corpos menores são enviados sem compressão
+MAX_REPRESENTACOES = 64  # combinações de filtros mantidas já serializadas
+
+MOTIVOS = {
+    200: 'OK', 202: 'Accepted', 204: 'No Content', 304: 'Not Modified',
+    400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    431: 'Request Header Fields Too Large', 500: 'Internal Server Error',
+    503: 'Service Unavailable',
+}
+
+CABECALHOS_CORS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Methods': 'GET, POST, OPTIONS',
+    'Access-Control-Allow-Headers': 'Content-Type, If-None-Match',
+    'Access-Control-Expose-Headers': 'ETag',
+}
+
+def corpo_json(dados):
+    return json.dumps(dados, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def codificacoes_aceitas(cabecalho):
+    """Codificações de Accept-Encoding com q > 0"""
+    aceitas = set()
+    for parte in (cabecalho or '').split(','):
+        nome, _, parametros = parte.strip().partition(';')
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith('q='):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        if nome and qualidade > 0:
+            aceitas.add(nome.strip().lower())
+    return aceitas
+
+def etag_confere(cabecalho, etag):
+    """Indica se If-None-Match inclui ``etag`` (comparação fraca, como pede o RFC 9110)"""
+    if not cabecalho:
+        return False
+    if cabecalho.strip() == '*':
+        return True
+    return any(valor.strip().removeprefix('W/') == etag for valor in cabecalho.split(','))
+
+class Representacao:
+    """Corpo de uma resposta do feed já serializado e comprimido
+
+    Cada codificação tem sua ETag forte, derivada do conteúdo sem
+    compressão, para que caches não misturem variantes.
+    """
+
+    def __init__(self, corpo):
+        base = hashlib.sha1(corpo).hexdigest()[:20]
+        self.variantes = {None: (corpo, f'"{base}"')}
+        if len(corpo) >= TAMANHO_MINIMO_COMPRESSAO:
+            self.variantes['gzip'] = (gzip.compress(corpo, 6, mtime=0), f'"{base}-gz"')
+            if brotli is not None:
+                self.variantes['br'] = (brotli.compress(corpo), f'"{base}-br"')
+
+    def escolher(self, accept_encoding):
+        """Retorna (codificação, corpo, etag) para o Accept-Encoding do cliente"""
+        aceitas = codificacoes_aceitas(accept_encoding)
+        for codificacao in ('br', 'gzip'):
+            if codificacao in aceitas and codificacao in self.variantes:
+                return (codificacao,) + self.variantes[codificacao]
+        return (None,) + self.variantes[None]
+
+class ServidorFeed:
+    """Servidor asyncio sobre um ``ServicoNoticias``
+
+    ``GET /api/noticias`` aceita ``?fonte=`` (repetível, sem diferenciar
+    acentos e maiúsculas) e ``?limit=``. ``POST /api/atualizar`` responde
+    imediatamente; pedidos que chegam enquanto uma atualização está em
+    andamento se juntam a ela em vez de iniciar outra coleta.
+    """
+
+    def __init__(self, servico, host=HOST, porta=PORTA):
+        self.servico = servico
+        self.host = host
+        self.porta = porta
+        self._representacoes = {}
+        self._versao_representacoes = None
+        self._atualizacao = None
+
+    # Feed
+
+    def representacao(self, fontes, limite):
+        """Representação em cache para os filtros, recriada quando o feed muda"""
+        noticias, versao, dados = self.servico.feed()
+        if versao != self._versao_representacoes or len(self._representacoes) >= MAX_REPRESENTACOES:
+            self._representacoes = {}
+            self._versao_representacoes = versao
+
+        chave = (fontes, limite)
+        if chave not in self._representacoes:
+            if fontes:
+                noticias = [n for n in noticias if remover_acentos(n.get('fonte')) in fontes]
+            if limite is not None:
+                noticias = noticias[:limite]
+            self._representacoes[chave] = Representacao(corpo_json({
+                "success": True,
+                "noticias": noticias,
+                "total": len(noticias),
+                "versao": versao,
+                "ultimaAtualizacao": dados['ultimaAtualizacao'],
+                "totalPortais": len(self.servico.portais),
+            }))
+        return self._representacoes[chave]
+
+    def atualizar_em_segundo_plano(self):
+        """Inicia uma atualização completa, ou retorna a que já está em andamento"""
+        em_andamento = self._atualizacao is not None and not self._atualizacao.done()
+        if not em_andamento:
+            loop = asyncio.get_running_loop()
+            self._atualizacao = loop.run_in_executor(None, self.servico.atualizar, self.servico.portais)
+            self._atualizacao.add_done_callback(self._registrar_fim_atualizacao)
+        return em_andamento
+
+    @staticmethod
+    def _registrar_fim_atualizacao(futuro):
+        if not futuro.cancelled() and futuro.exception() is not None:
+            print(f"💥 Erro na atualização solicitada: {futuro.exception()}")
+
+    # Rotas
+
+    def tratar(self, metodo, alvo, cabecalhos):
+        """Retorna (status, cabeçalhos extras, corpo) da requisição"""
+        partes = urlsplit(alvo)
+        rota = partes.path.rstrip('/')
+
+        if metodo == 'OPTIONS':
+            return 204, {}, b''
+
+        if rota == '/api/noticias':
+            if metodo not in ('GET', 'HEAD'):
+                return 405, {'Allow': 'GET, HEAD, OPTIONS'}, corpo_json({"success": False, "error": "Método não permitido"})
+
+            consulta = parse_qs(partes.query)
+            fontes = frozenset(remover_acentos(f).strip() for f in consulta.get('fonte', []) if f.strip())
+            limite = None
+            if consulta.get('limit'):
+                try:
+                    limite = int(consulta['limit'][-1])
+                except ValueError:
+                    limite = -1
+                if limite < 1:
+                    return 400, {}, corpo_json({"success": False, "error": "limit deve ser um inteiro positivo"})
+
+            if self.servico.feed()[2] is None:
+                return 503, {'Retry-After': '10'}, corpo_json({"success": False, "error": "Feed ainda não disponível"})
+
+            codificacao, corpo, etag = self.representacao(fontes, limite).escolher(cabecalhos.get('accept-encoding'))
+            extras = {'ETag': etag, 'Vary': 'Accept-Encoding', 'Cache-Control': 'no-cache'}
+            if etag_confere(cabecalhos.get('if-none-match'), etag):
+                return 304, extras, b''
+            if codificacao:
+                extras['Content-Encoding'] = codificacao
+            return 200, extras, corpo
+
+        if rota == '/api/atualizar':
+            if metodo != 'POST':
+                return 405, {'Allow': 'POST, OPTIONS'}, corpo_json({"success": False, "error": "Método não permitido"})
+            em_andamento = self.atualizar_em_segundo_plano()
+            return 202, {}, corpo_json({
+                "success": True,
+                "emAndamento": em_andamento,
+                "versao": self.servico.feed()[1],
+                "solicitadoEm": datetime.now().isoformat(),
+            })
+
+        return 404, {}, corpo_json({"success": False, "error": "Rota não encontrada"})
+
+    # Protocolo
+
+    async def ler_requisicao(self, reader):
+        """Lê linha de requisição e cabeçalhos; None quando a conexão termina"""
+        try:
+            linha = await asyncio.wait_for(reader.readline(), TEMPO_OCIOSO)
+        except asyncio.TimeoutError:
+            return None
+        if not linha.strip():
+            return None
+
+        partes = linha.decode('latin-1').split()
+        if len(partes) != 3:
+            raise ValueError('linha de requisição inválida')
+        metodo, alvo, versao_http = partes
+
+        cabecalhos = {}
+        tamanho = len(linha)
+        while True:
+            linha = await asyncio.wait_for(reader.readline(), TEMPO_OCIOSO)
+            tamanho += len(linha)
+            if tamanho > TAMANHO_MAXIMO_CABECALHOS:
+                raise OverflowError('cabeçalhos grandes demais')
+            if linha in (b'\r\n', b'\n', b''):
+                break
+            nome, _, valor = linha.decode('latin-1').partition(':')
+            cabecalhos[nome.strip().lower()] = valor.strip()
+
+        # O corpo não é usado por nenhuma rota, mas precisa ser consumido
+        tamanho_corpo = int(cabecalhos.get('content-length') or 0)
+        if tamanho_corpo:
+            await asyncio.wait_for(reader.readexactly(tamanho_corpo), TEMPO_OCIOSO)
+
+        return metodo.upper(), alvo, versao_http.upper(), cabecalhos
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    requisicao = await self.ler_requisicao(reader)
+                except OverflowError:
+                    await self.responder(writer, 431, {}, b'', manter=False)
+                    break
+                except (ValueError, asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    await self.responder(writer, 400, {}, b'', manter=False)
+                    break
+                if requisicao is None:
+                    break
+
+                metodo, alvo, versao_http, cabecalhos = requisicao
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao != 'close' if versao_http == 'HTTP/1.1' else conexao == 'keep-alive'
+
+                try:
+                    status, extras, corpo = self.tratar(metodo, alvo, cabecalhos)
+                except Exception as e:
+                    print(f"💥 Erro ao atender {metodo} {alvo}: {e}")
+                    status, extras, corpo = 500, {}, corpo_json({"success": False, "error": str(e)})
+
+                await self.responder(writer, status, extras, corpo, manter, enviar_corpo=metodo != 'HEAD')
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def responder(self, writer, status, extras, corpo, manter, enviar_corpo=True):
+        cabecalhos = dict(CABECALHOS_CORS, **extras)
+        if corpo or status not in (204, 304):
+            cabecalhos.setdefault('Content-Type', 'application/json; charset=utf-8')
+            cabecalhos['Content-Length'] = str(len(corpo))
+        cabecalhos['Connection'] = 'keep-alive' if manter else 'close'
+
+        linhas = [f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}"]
+        linhas.extend(f"{nome}: {valor}" for nome, valor in cabecalhos.items())
+        writer.write(('\r\n'.join(linhas) + '\r\n\r\n').encode('latin-1'))
+        if enviar_corpo and corpo:
+            writer.write(corpo)
+        await writer.drain()
+
+    async def servir(self):
+        servidor = await asyncio.start_server(self.atender, self.host, self.porta)
+        print(f"🌐 Feed disponível em http://{self.host}:{self.porta}/api/noticias")
+        async with servidor:
+            await servidor.serve_forever()
+
+def main(host=HOST, porta=PORTA, intervalo=INTERVALO_ATUALIZACAO, processos_parse=0):
+    """Roda o modo contínuo do scraper e o servidor do feed no mesmo processo"""
+    servico = ServicoNoticias(PORTAIS_PARCEIROS, intervalo=intervalo, processos_parse=processos_parse)
+    threading.Thread(target=servico.executar, name='servico-noticias', daemon=True).start()
+    try:
+        asyncio.run(ServidorFeed(servico, host, porta).servir())
+    except KeyboardInterrupt:
+        print("\n👋 Servidor encerrado")
+    finally:
+        servico.parar()
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Servidor local do feed de notícias parceiras")
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--intervalo', type=float, default=INTERVALO_ATUALIZACAO,
+                        help='intervalo padrão entre consultas a cada portal (segundos)')
+    parser.add_argument('--processos', type=int, default=0,
+                        help='faz o parse das páginas em N processos')
+    args = parser.parse_args()
+
+    main(args.host, args.porta, args.intervalo, args.processos)
@@ -4,12 +4,13 @@
 Teste específico para verificar se o Bing News está funcionando
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 import time
 from datetime import datetime
 
+from cliente_http import obter_sessao
+
 def testar_bing_news():
     """Testa especificamente a coleta do Bing News"""
     print("🧪 Testando integração com Bing News...")
@@ -34,7 +35,7 @@ def testar_bing_news():
             'Referer': 'https://www.bing.com/'
         }
         
-        response = requests.get(portal_bing['busca'], headers=headers, timeout=20)
+        response = obter_sessao().get(portal_bing['busca'], headers=headers, timeout=20)
         print(f"📡 Status da resposta: {response.status_code}")
         
         if response.status_code == 200:
@@ -113,7 +114,7 @@ def testar_url_alternativa():
                 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
             }
             
-            response = requests.get(url, headers=headers, timeout=15)
+            response = obter_sessao().get(url, headers=headers, timeout=15)
             print(f"   Status: {response.status_code}")
             
             if response.status_code == 200:
@@ -5,12 +5,13 @@ Teste específico para o site Bem Paraná
 Baseado na análise da estrutura fornecida pelo usuário
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 import time
 from datetime import datetime
 
+from cliente_http import obter_sessao
+
 def testar_bem_parana_manual():
     """Testa o Bem Paraná baseado na URL exata do usuário"""
     print("🎯 Testando Bem Paraná com URL específica...")
@@ -27,7 +28,7 @@ def testar_bem_parana_manual():
     
     try:
         print(f"📡 Acessando: {url_busca}")
-        response = requests.get(url_busca, headers=headers, timeout=15)
+        response = obter_sessao().get(url_busca, headers=headers, timeout=15)
         print(f"📊 Status: {response.status_code}")
         
         if response.status_code == 200:
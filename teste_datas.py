@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Teste da normalização de datas
+Confere os formatos aceitos e frases comuns que não podem virar datas
+"""
+
+import sys
+from datetime import datetime
+
+from datas import FUSO, normalizar_data
+
+REFERENCIA = datetime(2026, 10, 18, 12, 0, tzinfo=FUSO)
+
+# Texto -> início esperado do ISO (None: não é data)
+CASOS = {
+    '17 de outubro de 2026': '2026-10-17T00:00',
+    '17 out 2026 10:30': '2026-10-17T10:30',
+    '3 de março': '2026-03-03',
+    '12 fev.': '2026-02-12',
+    '17/10/2026 08h15': '2026-10-17T08:15',
+    '2026-10-01T10:00:00Z': '2026-10-01T07:00:00-03:00',
+    '2026-10-01T10:00:00+00:00': '2026-10-01T07:00:00-03:00',
+    'Oct 17, 2026': '2026-10-17',
+    'Sep 3': '2026-09-03',
+    'December 28': '2025-12-28',
+    'há 2 horas': '2026-10-18T10:00',
+    'Atualizado 1 ano atrás': '2025-10-18',
+    '3 days ago': '2026-10-15',
+    '2h': '2026-10-18T10:00',
+    'ontem às 14h30': '2026-10-17T14:30',
+    # Palavras que começam como um mês
+    'Mais 3 notícias': None,
+    'outras 5': None,
+    'Setor 4 da prefeitura': None,
+    'Junta 2 de conciliação': None,
+    'Decisão 7 do TJ': None,
+    'Dez 10 anos depois': None,
+}
+
+def main():
+    print("🧪 Testando normalização de datas...")
+    falhas = 0
+    for texto, esperado in CASOS.items():
+        obtido = normalizar_data(texto, referencia=REFERENCIA)
+        certo = obtido is None if esperado is None else (obtido or '').startswith(esperado)
+        if not certo:
+            falhas += 1
+        print(f"   {'✅' if certo else '❌'} {texto!r:32} → {obtido} (esperado {esperado})")
+
+    print(f"\n{'✅ Todos os casos passaram' if not falhas else f'❌ {falhas} caso(s) falharam'}")
+    return 1 if falhas else 0
+
+if __name__ == "__main__":
+    sys.exit(main())